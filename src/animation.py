@@ -0,0 +1,110 @@
+from collections import deque
+
+
+class Animation:
+    """
+    Effect advanced once per frame by the main loop instead of running its
+    own blocking loop. Exclusive animations own the screen and are played one
+    after the other, the others are overlays drawn on top of the scene.
+    """
+
+    def __init__(self, exclusive=True, on_start=None, on_finish=None):
+        self.exclusive = exclusive
+        self.on_start = on_start
+        self.on_finish = on_finish
+        self.start_time = None
+
+    def start(self, now):
+        self.start_time = now
+        if self.on_start:
+            self.on_start()
+
+    def update(self, now):
+        """Advances the animation, returns False once it is over."""
+        return False
+
+    def draw(self, screen):
+        """Draws the current frame, returns the screen area it changed."""
+        return None
+
+    def finish(self):
+        if self.on_finish:
+            self.on_finish()
+
+
+class TimedAnimation(Animation):
+    """Animation of fixed duration drawn by a draw_frame(elapsed) callback."""
+
+    def __init__(self, duration, draw_frame=None, **kwargs):
+        super().__init__(**kwargs)
+        self.duration = duration
+        self.draw_frame = draw_frame
+        self.elapsed = 0
+
+    def update(self, now):
+        self.elapsed = min(now - self.start_time, self.duration)
+        return self.elapsed < self.duration
+
+    def draw(self, screen):
+        if self.draw_frame:
+            return self.draw_frame(self.elapsed)
+        return None
+
+
+class Timeline:
+    """Holds the running animations and advances them frame by frame."""
+
+    def __init__(self):
+        self.sequence = deque()
+        self.overlays = []
+
+    def play(self, animation):
+        if animation.exclusive:
+            self.sequence.append(animation)
+        else:
+            self.overlays.append(animation)
+
+    @property
+    def busy(self):
+        """True while an exclusive animation is running or waiting."""
+        return bool(self.sequence)
+
+    @property
+    def active(self):
+        return bool(self.sequence or self.overlays)
+
+    def playing(self, animation):
+        """True while animation is running or waiting its turn."""
+        return animation in self.sequence or animation in self.overlays
+
+    def update(self, now, screen, compositor):
+        """
+        Advances and draws one frame, handing the areas drawn to compositor.
+        Returns True if an animation ended.
+        """
+        finished = False
+        if self.sequence:
+            if self._step(self.sequence[0], now, screen, compositor):
+                self.sequence.popleft().finish()
+                finished = True
+        for animation in list(self.overlays):
+            if self._step(animation, now, screen, compositor):
+                self.overlays.remove(animation)
+                animation.finish()
+                finished = True
+        return finished
+
+    def _step(self, animation, now, screen, compositor):
+        if animation.start_time is None:
+            animation.start(now)
+        alive = animation.update(now)
+        compositor.add(animation.draw(screen))
+        return not alive
+
+    def clear(self):
+        self.sequence.clear()
+        self.overlays.clear()
+
+    def clear_overlays(self):
+        """Drops the overlays, without finishing them."""
+        self.overlays.clear()
@@ -0,0 +1,166 @@
+import json
+import logging
+import mmap
+import os
+import struct
+
+import pygame
+
+from src.gif_clip import GifClip
+
+MAGIC = b"BAST"
+CACHE_VERSION = 1
+HEADER = struct.Struct("<4sII")  # magic, version, index length
+ASSETS_DIR = os.path.join(os.path.dirname(__file__), "..", "assets")
+
+
+def source_stamp(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class AssetBake:
+    """
+    Collects decoded assets (raw pixels of scaled images and GIF frames, PCM
+    of sounds) while the display loads them, and writes them to the cache
+    file read back by AssetCache.
+    """
+
+    def __init__(self):
+        self.sources = {}
+        self.entries = {}
+        self.blobs = []
+        self.size = 0
+
+    def add_image(self, key, path, surface, alpha=False):
+        self.entries[key] = dict(type="image", **self._add_surface(surface, alpha))
+        self._add_source(path)
+
+    def add_clip(self, key, path, clip):
+        self.entries[key] = {
+            "type": "clip",
+            "frames": [self._add_surface(frame, True) for frame in clip.frames],
+            "durations": clip.durations,
+        }
+        self._add_source(path)
+
+    def add_sound(self, key, path, sound):
+        self.entries[key] = dict(type="sound", **self._add_blob(sound.get_raw()))
+        self._add_source(path)
+
+    def write(self, path, screen_size):
+        index = json.dumps(
+            {
+                "screen": list(screen_size),
+                "mixer": list(pygame.mixer.get_init()),
+                "sources": self.sources,
+                "entries": self.entries,
+            }
+        ).encode()
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as cache_file:
+            cache_file.write(HEADER.pack(MAGIC, CACHE_VERSION, len(index)))
+            cache_file.write(index)
+            for blob in self.blobs:
+                cache_file.write(blob)
+        os.replace(temp_path, path)
+
+    def _add_source(self, path):
+        relative_path = os.path.relpath(path, ASSETS_DIR)
+        self.sources[relative_path] = source_stamp(path)
+
+    def _add_surface(self, surface, alpha):
+        mode = "RGBA" if alpha else "RGB"
+        entry = self._add_blob(pygame.image.tobytes(surface, mode))
+        entry.update(size=list(surface.get_size()), mode=mode)
+        return entry
+
+    def _add_blob(self, blob):
+        entry = {"offset": self.size, "length": len(blob)}
+        self.blobs.append(blob)
+        self.size += len(blob)
+        return entry
+
+
+class AssetCache:
+    """
+    Read side of the baked asset cache. The file is memory mapped, an asset
+    costs a copy into a display surface or a mixer sound instead of decoding
+    and scaling it. open() returns None when the cache is missing or stale.
+    """
+
+    def __init__(self, cache_file, data, index, data_start):
+        self.cache_file = cache_file
+        self.data = data
+        self.view = memoryview(data)
+        self.entries = index["entries"]
+        self.data_start = data_start
+
+    @classmethod
+    def open(cls, path, screen_size):
+        try:
+            cache_file = open(path, "rb")
+        except OSError:
+            logging.info("No baked asset cache, decoding the assets")
+            return None
+        try:
+            data = mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, index_length = HEADER.unpack_from(data)
+            if magic != MAGIC or version != CACHE_VERSION:
+                raise ValueError(f"unsupported cache version {version}")
+            index = json.loads(data[HEADER.size : HEADER.size + index_length])
+            stale = cls.stale_reason(index, screen_size)
+            if stale:
+                raise ValueError(stale)
+        except (OSError, ValueError, struct.error) as e:
+            logging.warning(f"Ignoring the baked asset cache: {e}")
+            cache_file.close()
+            return None
+        return cls(cache_file, data, index, HEADER.size + index_length)
+
+    @staticmethod
+    def stale_reason(index, screen_size):
+        if index["screen"] != list(screen_size):
+            return "baked for another screen size"
+        if index["mixer"] != list(pygame.mixer.get_init()):
+            return "baked for another mixer format"
+        for relative_path, stamp in index["sources"].items():
+            path = os.path.join(ASSETS_DIR, relative_path)
+            if not os.path.exists(path) or source_stamp(path) != stamp:
+                return f"{relative_path} changed"
+        return None
+
+    def image(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        return self._surface(entry)
+
+    def clip(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        return GifClip(
+            [self._surface(frame) for frame in entry["frames"]], entry["durations"]
+        )
+
+    def sound(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        return pygame.mixer.Sound(buffer=self._blob(entry))
+
+    def close(self):
+        self.view.release()
+        self.data.close()
+        self.cache_file.close()
+
+    def _surface(self, entry):
+        surface = pygame.image.frombuffer(
+            self._blob(entry), tuple(entry["size"]), entry["mode"]
+        )
+        return surface.convert_alpha() if entry["mode"] == "RGBA" else surface.convert()
+
+    def _blob(self, entry):
+        start = self.data_start + entry["offset"]
+        return self.view[start : start + entry["length"]]
@@ -0,0 +1,91 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from src.constants import ASSET_LOAD_WORKERS
+
+
+class AssetManager:
+    """
+    Loads assets by name, either right away or on a small worker pool so the
+    first screens show before everything is decoded. get() only blocks when
+    an asset is needed before its background load is over.
+    """
+
+    def __init__(self, workers=ASSET_LOAD_WORKERS):
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="assets")
+        self.futures = {}
+        self.load_times = {}
+        self.wait_times = {}
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.loaded_callbacks = []
+
+    def load(self, name, loader, background=True):
+        """Starts loading name with loader(), in the background by default."""
+        if background:
+            with self.lock:
+                self.pending += 1
+            future = self.executor.submit(self._timed_load, name, loader)
+            future.add_done_callback(self._background_done)
+        else:
+            future = Future()
+            try:
+                future.set_result(self._timed_load(name, loader))
+            except Exception as e:
+                future.set_exception(e)
+        self.futures[name] = future
+
+    def get(self, name):
+        """Returns the asset, raises what its loader raised."""
+        future = self.futures[name]
+        if not future.done():
+            start_time = time.perf_counter()
+            future.exception()
+            self.wait_times[name] = time.perf_counter() - start_time
+            logging.info(
+                f"Waited {self.wait_times[name] * 1000:.0f}ms for asset {name}"
+            )
+        return future.result()
+
+    def on_all_loaded(self, callback):
+        """Calls callback once no background load is left."""
+        with self.lock:
+            if self.pending:
+                self.loaded_callbacks.append(callback)
+                return
+        callback()
+
+    def _timed_load(self, name, loader):
+        start_time = time.perf_counter()
+        try:
+            return loader()
+        finally:
+            self.load_times[name] = time.perf_counter() - start_time
+
+    def _background_done(self, future):
+        with self.lock:
+            self.pending -= 1
+            if self.pending:
+                return
+            callbacks, self.loaded_callbacks = self.loaded_callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def report(self):
+        lines = []
+        for name in sorted(self.load_times, key=self.load_times.get, reverse=True):
+            line = f"{name}: {self.load_times[name] * 1000:.0f}ms"
+            if name in self.wait_times:
+                line += f" (waited {self.wait_times[name] * 1000:.0f}ms)"
+            lines.append(line)
+        return lines
+
+    def dump(self):
+        logging.info("Asset load times:")
+        for line in self.report() or ["no asset"]:
+            logging.info(f"  {line}")
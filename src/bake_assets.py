@@ -0,0 +1,51 @@
+"""
+Bakes the decoded assets (scaled images, GIF frames and sound PCM) into the
+asset cache file, read back with mmap at startup. Run it again after changing
+an asset, the screen size or the mixer format, a stale cache is ignored.
+
+    python -m src.bake_assets
+"""
+
+import argparse
+import logging
+import os
+import time
+
+import pygame
+
+from src.asset_cache import AssetBake
+from src.constants import ASSET_CACHE_FILE
+from src.display import Display
+from src.sound_bank import configure_mixer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", default=ASSET_CACHE_FILE)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    # The assets only need a screen format, not a window
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    configure_mixer()
+    pygame.init()
+    try:
+        pygame.mixer.init()
+    except pygame.error:
+        # The sounds are decoded to the same format without a sound card
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+        pygame.mixer.init()
+
+    start_time = time.monotonic()
+    bake = AssetBake()
+    display = Display(bake=bake)
+    bake.write(args.output, display.screen.get_size())
+    logging.info(
+        f"Baked {len(bake.entries)} assets ({bake.size / 1024 / 1024:.1f}MiB) "
+        f"into {args.output} in {time.monotonic() - start_time:.1f}s"
+    )
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Headless run of the full scene flow (menu -> game -> win -> end menu),
+driven by scripted pin presses, to benchmark rendering and game logic on any
+Linux box and to check that long sessions stay flat in memory and stack.
+
+    python -m src.bench --games 20 --soak
+
+With --soak the run exits with status 1 when the stack depth changes between
+games or when the traced memory grows past --max-growth after warm-up.
+"""
+
+import argparse
+import logging
+import sys
+import time
+import tracemalloc
+
+from src.constants import (
+    PIN_BENTER,
+    PIN_DOWN,
+    PIN_UP,
+    PIN_H20,
+    PIN_H25,
+    PIN_H40,
+    PIN_HBOTTLE,
+    PIN_HSFROG,
+)
+from src.game import Game
+from src.scripted_pins import ScriptedPinSource
+
+# 435 points, enough to win the default 400 points single player game
+GAME_HITS = [PIN_H20, PIN_H25, PIN_HBOTTLE, PIN_HSFROG, PIN_H40]
+WARMUP_GAMES = 2  # Games filling the caches before memory has to stay flat
+
+
+def stack_depth():
+    depth = 0
+    frame = sys._getframe()
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    return depth
+
+
+class BenchGame(Game):
+    """Game sampling memory and stack depth every time a game starts."""
+
+    def __init__(self, *args, trace_memory=False, **kwargs):
+        self.trace_memory = trace_memory
+        self.samples = []
+        super().__init__(*args, **kwargs)
+
+    def start_game(self):
+        memory = tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+        self.samples.append((memory, stack_depth()))
+        super().start_game()
+
+
+def build_script(games, scene_is):
+    """Plays games times, going through "Nouveau", and leaves on "Continuer"."""
+    steps = []
+    selected_option = 0  # The end menu remembers its selection
+    for game in range(games):
+        steps.append((scene_is("menu"), PIN_BENTER))
+        steps += [(scene_is("game"), pin) for pin in GAME_HITS]
+        target_option = 1 if game < games - 1 else 0
+        while selected_option < target_option:
+            steps.append((scene_is("end_menu"), PIN_DOWN))
+            selected_option += 1
+        while selected_option > target_option:
+            steps.append((scene_is("end_menu"), PIN_UP))
+            selected_option -= 1
+        steps.append((scene_is("end_menu"), PIN_BENTER))
+    return steps
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument("--fps", type=int, help="override every scene rate")
+    parser.add_argument("--soak", action="store_true", help="trace memory")
+    parser.add_argument(
+        "--max-growth",
+        type=int,
+        default=512,
+        help="KiB of memory growth allowed after warm-up with --soak",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.soak:
+        tracemalloc.start()
+
+    game = None
+    source = ScriptedPinSource(
+        build_script(args.games, lambda name: lambda: game and game.scene == name)
+    )
+    game = BenchGame(headless=True, pin_source=source, trace_memory=args.soak)
+    if args.fps:
+        game.scheduler.rates = dict.fromkeys(game.scheduler.rates, args.fps)
+
+    start_time = time.monotonic()
+    game.run()
+    elapsed = time.monotonic() - start_time
+    game.pin.stop()
+
+    logging.info(f"{len(game.samples)} games in {elapsed:.1f}s")
+    depths = [depth for _, depth in game.samples]
+    logging.info(f"Stack depth at game start: min={min(depths)} max={max(depths)}")
+    if not args.soak:
+        return 0
+
+    failures = []
+    if min(depths) != max(depths):
+        failures.append(f"stack depth changed between games: {depths}")
+    first, last = game.samples[0][0], game.samples[-1][0]
+    logging.info(
+        f"Traced memory at game start: first={first / 1024:.0f}KiB "
+        f"last={last / 1024:.0f}KiB growth={(last - first) / 1024:.0f}KiB"
+    )
+    if len(game.samples) > WARMUP_GAMES:
+        growth = (last - game.samples[WARMUP_GAMES][0]) / 1024
+        logging.info(f"Memory growth after warm-up: {growth:.0f}KiB")
+        if growth > args.max_growth:
+            failures.append(
+                f"memory grew by {growth:.0f}KiB after warm-up "
+                f"(limit {args.max_growth}KiB)"
+            )
+    else:
+        logging.warning(
+            f"Only {len(game.samples)} games, play more than {WARMUP_GAMES} "
+            "to check memory growth after warm-up"
+        )
+    for failure in failures:
+        logging.error(f"Soak test failed: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+import pygame
+
+
+class Compositor:
+    """
+    Collects the screen areas touched while drawing a frame and presents
+    them once at the end of the frame with a single display update.
+    """
+
+    def __init__(self, screen, full_ratio=0.5):
+        self.screen_rect = screen.get_rect()
+        # Above this share of the screen a full flip is cheaper than rects
+        self.full_area = self.screen_rect.width * self.screen_rect.height * full_ratio
+        self.rects = []
+        self.full = False
+
+    def add(self, rect):
+        if rect is None or self.full:
+            return
+        rect = pygame.Rect(rect).clip(self.screen_rect)
+        if rect.width and rect.height:
+            self.rects.append(rect)
+
+    def add_full(self):
+        self.full = True
+        self.rects.clear()
+
+    def present(self):
+        """Updates the display with this frame's areas, False if none."""
+        if not self.full and not self.rects:
+            return False
+        if self.full or sum(r.width * r.height for r in self.rects) > self.full_area:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.rects)
+        self.rects = []
+        self.full = False
+        return True
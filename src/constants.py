@@ -78,7 +78,36 @@ PIN_UP = 25
 PIN_DOWN = 26
 PIN_LEFT = 27
 PIN_RIGHT = 32
+PINS = (
+    PIN_H20,
+    PIN_H25,
+    PIN_H40,
+    PIN_H50,
+    PIN_H100,
+    PIN_HBOTTLE,
+    PIN_HSFROG,
+    PIN_HLFROG,
+    PIN_BNEXT,
+    PIN_BENTER,
+    PIN_UP,
+    PIN_DOWN,
+    PIN_LEFT,
+    PIN_RIGHT,
+)
 PIN_STATES_FILE = os.path.join(os.path.dirname(__file__), "..", "..", "pin_states.json")
+PIN_POLL_INTERVAL = 0.05  # Only used when inotify is not available
+PIN_SHM_FILE = "/dev/shm/bolirana_pins"
+INPUT_SAMPLE_RATE = 1000  # Hz, for the sampled (non event driven) backends
+INPUT_IDLE_SAMPLE_RATE = 50  # Hz, the same while the game is idle
+INPUT_BUFFER_SIZE = 256
+PIN_SOURCE_RETRY_DELAY = 1  # Seconds before reopening a pin source that failed
+# "shm" falls back to the JSON file when the GPIO daemon has no region set up
+PIN_BACKEND = os.environ.get("BOLIRANA_PIN_BACKEND", "shm")  # "shm" or "json"
+
+# Debounce hold-off per pin class, in seconds
+HOLE_HOLDOFF = 0.1
+NAVIGATION_HOLDOFF = 0.15
+NEXT_HOLDOFF = 0.3
 
 # Defines Holes
 
@@ -88,5 +117,47 @@ BLINK_INTERVAL = 0.2
 # Game Logic
 
 FPS = 30
+IDLE_TIMEOUT = 10  # Seconds without input before the loop waits for events
+IDLE_WAKE_INTERVAL = 1  # Longest idle wait, keeps signal handlers responsive
+IDLE_KEYBOARD_INTERVAL = 0.1  # Idle wait in debug mode, to see the keyboard
+SCENE_FPS = {
+    "menu": 30,
+    "game": 30,
+    "end_menu": 30,
+    "animation": 30,
+}
 ACTION_COOLDOWN = 3
+TEXT_CACHE_SIZE = 512  # Rendered text surfaces kept by the display
+ASSET_CACHE_FILE = os.path.join(
+    os.path.dirname(__file__), "..", "assets", "baked_assets.bin"
+)  # Written by python -m src.bake_assets
+ASSET_LOAD_WORKERS = 2  # Threads decoding assets in the background
+ROULETTE_ANGLE_STEP = 15  # Degrees between two pre-rendered roulette frames
+ROULETTE_TURNS = 2  # Full turns before the wheel reaches its result
+ROULETTE_SPIN_DURATION = 2.5  # Seconds, whatever the frame rate
+FIREWORK_BURSTS = 12  # Fireworks of the win animation
+FIREWORK_PARTICLES = 300  # Particles per firework
+FIREWORK_LAUNCH_WINDOW = 2  # Seconds over which the fireworks are launched
+FIREWORK_LIFESPAN = 4  # Seconds for a particle to fade out, on average
+PARTICLE_POOL_SIZE = 4800  # Particles shared by every effect, allocated once
+PARTICLE_STEP = 1 / 60  # Seconds simulated per particle step, whatever the FPS
+HIT_BURST_PARTICLES = {  # Particles burst out of a hole when it is hit
+    "side": 60,
+    "bottle": 150,
+    "little_frog": 150,
+    "large_frog": 300,
+}
+HIT_BURST_LIFESPAN = 1  # Seconds
 BLINK_INTERVAL = 0.2
+
+# Sound
+MIXER_FREQUENCY = int(os.environ.get("BOLIRANA_MIXER_FREQUENCY", 44100))
+MIXER_CHANNELS = 2
+# Samples per mixer buffer, lower means less latency but more risk of crackles
+MIXER_BUFFER = int(os.environ.get("BOLIRANA_MIXER_BUFFER", 256))
+SOUND_CATEGORIES = {  # Reserved mixer channels per sound category
+    "hit": 2,
+    "ui": 1,
+    "effect": 3,
+    "music": 1,
+}
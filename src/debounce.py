@@ -0,0 +1,71 @@
+from collections import namedtuple
+
+from src.constants import (
+    PIN_BENTER,
+    PIN_BNEXT,
+    PIN_DOWN,
+    PIN_UP,
+    PIN_LEFT,
+    PIN_RIGHT,
+    PIN_H20,
+    PIN_H25,
+    PIN_H40,
+    PIN_H50,
+    PIN_H100,
+    PIN_HBOTTLE,
+    PIN_HSFROG,
+    PIN_HLFROG,
+    HOLE_HOLDOFF,
+    NAVIGATION_HOLDOFF,
+    NEXT_HOLDOFF,
+)
+
+PinEvent = namedtuple("PinEvent", ["pin", "state", "timestamp"])
+
+PIN_HOLDOFFS = {
+    **{
+        pin: HOLE_HOLDOFF
+        for pin in (
+            PIN_H20,
+            PIN_H25,
+            PIN_H40,
+            PIN_H50,
+            PIN_H100,
+            PIN_HBOTTLE,
+            PIN_HSFROG,
+            PIN_HLFROG,
+        )
+    },
+    **{
+        pin: NAVIGATION_HOLDOFF
+        for pin in (PIN_BENTER, PIN_UP, PIN_DOWN, PIN_LEFT, PIN_RIGHT)
+    },
+    PIN_BNEXT: NEXT_HOLDOFF,
+}
+
+
+class Debouncer:
+    """
+    Filters raw pin samples into clean edges, independently for every pin.
+    A press (LOW) closer than the pin hold-off to the previous accepted press
+    of the same pin is a bounce, releases (HIGH) only re-arm the pin.
+    """
+
+    def __init__(self, holdoffs=PIN_HOLDOFFS, default_holdoff=HOLE_HOLDOFF):
+        self.holdoffs = holdoffs
+        self.default_holdoff = default_holdoff
+        self.states = {}
+        self.last_press_time = {}
+
+    def update(self, sample):
+        """Returns the PinEvent if the sample is a distinct edge, None otherwise."""
+        if self.states.get(sample.pin, "HIGH") == sample.state:
+            return None
+        if sample.state == "LOW":
+            last_press = self.last_press_time.get(sample.pin)
+            holdoff = self.holdoffs.get(sample.pin, self.default_holdoff)
+            if last_press is not None and sample.timestamp - last_press < holdoff:
+                return None
+            self.last_press_time[sample.pin] = sample.timestamp
+        self.states[sample.pin] = sample.state
+        return sample
@@ -4,6 +4,7 @@ import time
 import logging
 import sys
 import math
+from functools import partial
 from src.constants import (
     HOLE_RADIUS,
     CHROME_COLORS,
@@ -22,70 +23,199 @@ from src.constants import (
     GROUP_COLORS,
     BLINK_INTERVAL,
     PLAYER_OPTION_COLOR,
+    ASSET_CACHE_FILE,
+    HIT_BURST_LIFESPAN,
+    HIT_BURST_PARTICLES,
 )
-import random
-from src.firework import Firework
-from src.roulette import RouletteAnimation
-from PIL import Image
+from src.firework import FireworksAnimation, ParticleEffects
+from src.roulette import ROULETTE_VALUES, RouletteAnimation, RouletteWheel
+from src.animation import Timeline, TimedAnimation
+from src.latency import LatencyTracker
+from src.compositor import Compositor
+from src.text_cache import TextCache
+from src.fonts import GAME_FONT, font_registry
+from src.glyph_atlas import GlyphAtlas
+from src.gif_clip import GifClip
+from src.asset_cache import AssetCache
+from src.asset_manager import AssetManager
+from src.sound_bank import SoundBank
+
+HIT_BURST_COLORS = {
+    "side": DARK_ORANGE,
+    "bottle": DARK_GREEN,
+    "little_frog": YELLOW,
+    "large_frog": GOLD_COLORS[0],
+}
+
+
+def asset_property(name):
+    return property(lambda self: self.asset(name))
 
 
 class Display:
-    def __init__(self):
+    def __init__(self, bake=None):
         pygame.display.set_caption("Bolirana Game")
         self.screen = pygame.display.set_mode((1024, 768))
         # self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
 
         # Optionally, you can also set the window title
         pygame.display.set_caption("Bolirana")
-        font_path = os.path.join(
-            os.path.dirname(__file__), "..", "assets", "fonts", "AntonSC-Regular.ttf"
-        )
-        self.font_large = pygame.font.Font(font_path, 50)
-        self.font_medium = pygame.font.Font(font_path, 30)
-        self.font_small = pygame.font.Font(font_path, 25)
-        self.font_verysmall = pygame.font.Font(font_path, 20)
+        self.fonts = font_registry
+        self.font_large = self.fonts.get(GAME_FONT, 50)
+        self.font_medium = self.fonts.get(GAME_FONT, 30)
+        self.font_small = self.fonts.get(GAME_FONT, 25)
+        self.font_verysmall = self.fonts.get(GAME_FONT, 20)
         self.screen_width = self.screen.get_width()
         self.screen_height = self.screen.get_height()
+        self.latency = LatencyTracker()
+        self.timeline = Timeline()
+        self.compositor = Compositor(self.screen)
+        self.particles = ParticleEffects(self.screen, self.timeline, self.compositor)
+        self.text_cache = TextCache()
+        self.glyph_atlases = {}
+        self.roulettes = {}
+        self.current_player_rect = (20, 20, self.screen_width / 3 - 40, 200)
+        # Static part of the game screen, rebuilt by build_game_layer()
+        self.game_layer = None
+        # Records the decoded assets when baking the asset cache
+        self.bake = bake
 
         self.load_ressources()
 
     def load_ressources(self):
+        """
+        Loads the menu background right away and the other assets on the
+        asset manager workers, they are then reached through the properties
+        below, which only wait if an asset is not decoded yet.
+        """
+        self.asset_manager = AssetManager()
+        self.assets = None
+        if self.bake is None:
+            self.assets = AssetCache.open(ASSET_CACHE_FILE, self.screen.get_size())
+        # Baking records the assets in order, from this thread
+        background = self.bake is None
+        load = self.asset_manager.load
+        load("menu_background", lambda: self.load_image("images", "intro.bmp"), False)
+        self.sounds = SoundBank()
+
+        def load_sounds(*sounds):
+            for name, filename, category in sounds:
+                load(
+                    f"{name}_sound",
+                    lambda filename=filename: self.load_sound("sounds", filename),
+                    background,
+                )
+                self.sounds.add(name, category, partial(self.asset, f"{name}_sound"))
+
+        # Submitted in the order they are first needed: the workers decode
+        # what the first game frame and the first hits use before the
+        # roulette wheels, the clips and the win screen
+        load_sounds(
+            ("frog", "frog.mp3", "ui"),
+            ("intro", "intro.mp3", "music"),
+            ("bottle", "bouteille.mp3", "hit"),
+            ("aplause", "aplaudissement.mp3", "effect"),
+        )
+        load(
+            "game_background",
+            lambda: self.load_image("images", "game3.bmp"),
+            background,
+        )
+        for type, values in ROULETTE_VALUES.items():
+            wheel = RouletteWheel(self.screen, values, self.fonts.get(None, 80))
+            load(f"{type}_roulette_wheel", wheel.prerender, background)
+        load_sounds(
+            ("penalty", "fail.mp3", "effect"),
+            ("roulette", "roulette.mp3", "effect"),
+            ("roulette_end", "roulette_end.mp3", "effect"),
+            ("win", "victoire.mp3", "music"),
+        )
+        for name, loader in (
+            ("penalty_clip", lambda: self.load_gif("gif", "fail.gif")),
+            (
+                "little_frog_clip",
+                lambda: self.load_gif("gif", "small_frog_animation.gif"),
+            ),
+            (
+                "large_frog_clip",
+                lambda: self.load_gif("gif", "large_frog_animation.gif"),
+            ),
+            ("win_background", lambda: self.load_image("images", "win.bmp")),
+            (
+                "winner_banner",
+                lambda: self.load_image("images", "winner.bmp", (50, 50)),
+            ),
+        ):
+            load(name, loader, background)
+        self.menu_background  # Fails now if the first screen cannot be shown
+        self.asset_manager.on_all_loaded(self.close_asset_cache)
+
+    def close_asset_cache(self):
+        if self.assets:
+            self.assets.close()
+            self.assets = None
+
+    def asset(self, name):
         try:
-            self.game_background = self.load_image("images", "game3.bmp")
-            self.menu_background = self.load_image("images", "intro.bmp")
-            self.win_background = self.load_image("images", "win.bmp")
-            self.winner_banner = self.load_image("images", "winner.bmp")
-            self.winner_banner = pygame.transform.scale(self.winner_banner, (50, 50))
-            self.penalty_frames, self.penalty_duration = self.load_gif(
-                "gif", "fail.gif"
-            )
-            self.penalty_sound = self.load_sound("sounds", "fail.mp3")
-            self.win_sound = self.load_sound("sounds", "victoire.mp3")
-            self.large_frog_frames, self.large_frog_duration = self.load_gif(
-                "gif", "large_frog_animation.gif"
-            )
-            self.aplause = self.load_sound("sounds", "aplaudissement.mp3")
-            self.little_frog_frames, self.little_frog_duration = self.load_gif(
-                "gif", "small_frog_animation.gif"
-            )
+            return self.asset_manager.get(name)
         except Exception as e:
             logging.error(f"Failed to load resources: {e}")
             self.display_error_message("Failed to load resources. Exiting...")
             pygame.quit()
             sys.exit()
 
-    def load_image(self, folder, filename):
+    menu_background = asset_property("menu_background")
+    game_background = asset_property("game_background")
+    win_background = asset_property("win_background")
+    winner_banner = asset_property("winner_banner")
+    penalty_clip = asset_property("penalty_clip")
+    little_frog_clip = asset_property("little_frog_clip")
+    large_frog_clip = asset_property("large_frog_clip")
+
+    def load_image(self, folder, filename, size=None, alpha=False):
+        """
+        Decodes an image, converts it to the screen pixel format and scales it
+        once to its final size (the screen size by default), so that blitting
+        it is a plain copy.
+        """
         path = os.path.join(os.path.dirname(__file__), "..", "assets", folder, filename)
+        size = size or self.screen.get_size()
+        key = f"{folder}/{filename}@{size[0]}x{size[1]}"
+        image = self.assets and self.assets.image(key)
+        if image is not None:
+            if not alpha:
+                self.check_image_format(key, image)
+            return image
         image = pygame.image.load(path)
-        return pygame.transform.scale(image, self.screen.get_size())
+        image = image.convert_alpha() if alpha else image.convert()
+        image = pygame.transform.scale(image, size)
+        if not alpha:
+            self.check_image_format(key, image)
+        if self.bake:
+            self.bake.add_image(key, path, image, alpha)
+        return image
+
+    def check_image_format(self, key, image):
+        """Fails if an image would need a pixel format conversion on each blit."""
+        if image.get_bitsize() != self.screen.get_bitsize() or (
+            image.get_masks()[:3] != self.screen.get_masks()[:3]
+        ):
+            raise ValueError(f"{key} does not match the screen pixel format")
 
     def load_sound(self, folder, filename):
         path = os.path.join(os.path.dirname(__file__), "..", "assets", folder, filename)
-        return pygame.mixer.Sound(path)
+        key = f"{folder}/{filename}"
+        sound = self.assets and self.assets.sound(key)
+        if sound is not None:
+            return sound
+        sound = pygame.mixer.Sound(path)
+        if self.bake:
+            self.bake.add_sound(key, path, sound)
+        return sound
 
     def display_error_message(self, message):
         self.screen.fill((0, 0, 0))
-        error_text = self.font_large.render(message, True, RED)
+        error_text = self.text_cache.render(self.font_large, message, True, RED)
         self.screen.blit(
             error_text,
             (
@@ -140,12 +270,14 @@ class Display:
             return [(self.screen_width / 2), 55]
         return None
 
-    def draw_chrome_rect(self, rect, colors, border_radius, width):
+    def draw_chrome_rect(self, rect, colors, border_radius, width, surface=None):
         """Draws a rounded rectangle with a chrome effect."""
+        if surface is None:
+            surface = self.screen
         x, y, w, h = rect
         for i in range(width):
             pygame.draw.rect(
-                self.screen,
+                surface,
                 colors[i % len(colors)],
                 (x - i, y - i, w + 2 * i, h + 2 * i),
                 border_radius=border_radius - i if border_radius > i else 0,
@@ -162,22 +294,19 @@ class Display:
         outline_width=2,
         center=False,
     ):
-        outline_font = pygame.font.Font(font, font.size + outline_width * 2)
-        outline_text = outline_font.render(text, True, outline_color)
-        outline_rect = outline_text.get_rect()
+        """Renders text centered over a larger copy of itself in outline_color."""
+        outline_font = self.fonts.resized(font, outline_width * 2)
+        text_surface, origin = self.text_cache.render_outlined(
+            font, outline_font, text, text_color, outline_color
+        )
+        outline_rect = pygame.Rect((0, 0), outline_font.size(text))
         if center:
             outline_rect.center = position
         else:
             outline_rect.topleft = position
-        self.screen.blit(outline_text, outline_rect)
-
-        actual_text = font.render(text, True, text_color)
-        actual_rect = actual_text.get_rect()
-        if center:
-            actual_rect.center = outline_rect.center
-        else:
-            actual_rect.topleft = outline_rect.topleft
-        self.screen.blit(actual_text, actual_rect)
+        return self.screen.blit(
+            text_surface, (outline_rect.x - origin[0], outline_rect.y - origin[1])
+        )
 
     def draw_menu(self, menu):
         self.screen.blit(self.menu_background, (0, 0))  # Draw the background image
@@ -236,8 +365,12 @@ class Display:
             self.screen.blit(rect_surface, (x + border_width, y + border_width))
 
             # Render text
-            name_text = self.font_medium.render(option["name"], True, WHITE)
-            value_text = self.font_medium.render(str(option["value"]), True, YELLOW)
+            name_text = self.text_cache.render(
+                self.font_medium, option["name"], True, WHITE
+            )
+            value_text = self.text_cache.render(
+                self.font_medium, str(option["value"]), True, YELLOW
+            )
 
             # Calculate center positions for the texts within the rectangle
             name_text_rect = name_text.get_rect(
@@ -251,7 +384,7 @@ class Display:
             self.screen.blit(name_text, name_text_rect)
             self.screen.blit(value_text, value_text_rect)
 
-        pygame.display.flip()
+        self.compositor.add_full()
 
     def draw_end_menu(self, menu):
         self.screen.blit(self.menu_background, (0, 0))  # Draw the background image
@@ -310,7 +443,9 @@ class Display:
             self.screen.blit(rect_surface, (x + border_width, y + border_width))
 
             # Render text
-            name_text = self.font_medium.render(str(option), True, WHITE)
+            name_text = self.text_cache.render(
+                self.font_medium, str(option), True, WHITE
+            )
 
             # Calculate center positions for the texts within the rectangle
             name_text_rect = name_text.get_rect(
@@ -320,11 +455,10 @@ class Display:
             # Blit centered text
             self.screen.blit(name_text, name_text_rect)
 
-        pygame.display.flip()
+        self.compositor.add_full()
 
     def play_intro(self):
-        sound = self.load_sound("sounds", "intro.mp3")
-        sound.play()
+        self.sounds.play("intro")
 
     def draw_game(
         self,
@@ -336,9 +470,13 @@ class Display:
         team_mode,
         player_in_team=0,
     ):
-        self.screen.blit(self.game_background, (0, 0))
-        self.draw_static_elements(current_player, score, game_mode, team_mode, holes)
+        if self.game_layer is None:
+            self.build_game_layer(holes, score, game_mode, team_mode)
+        self.screen.blit(self.game_layer, (0, 0))
+        self.compositor.add_full()
+        self.draw_current_player(current_player, score)
         self.display_grouped_players(players, team_mode, player_in_team)
+        self.latency.drawn()
 
     def draw_score(
         self,
@@ -353,11 +491,74 @@ class Display:
         self.display_grouped_players(
             players, team_mode, player_in_team, only_score=True
         )
-        self.draw_static_elements(
-            current_player, score, game_mode, team_mode, holes, only_score=True
+        self.draw_current_player(current_player, score, only_score=True)
+        self.latency.drawn()
+
+    def build_game_layer(self, holes, score, game_mode, team_mode):
+        """
+        Renders the parts of the game screen that do not change during a game
+        (background, panels, holes and game options) once, each frame then
+        starts from a copy of this layer.
+        """
+        layer = pygame.Surface(self.screen.get_size()).convert(self.screen)
+        layer.blit(self.game_background, (0, 0))
+
+        # Border of the current player panel, its texts change every turn
+        self.draw_chrome_rect(self.current_player_rect, CHROME_COLORS, 15, 5, layer)
+
+        self.draw_holes(holes, layer)
+
+        # Define the area for the game options and add chrome border
+        game_mode_rect = (
+            self.screen_width - (self.screen_width / 3 - 20),
+            20,
+            self.screen_width / 3 - 40,
+            200,
         )
+        self.draw_chrome_rect(game_mode_rect, CHROME_COLORS, 15, 5, layer)
+
+        # Calculate center positions for the game options texts within the rectangle
+        rect_x, rect_y, rect_width, rect_height = game_mode_rect
+        game_mode_text_position = (rect_x + rect_width / 2, rect_y + 40)
+        score_text_position = (rect_x + rect_width / 2, rect_y + 100)
+        team_mode_text_position = (rect_x + rect_width / 2, rect_y + 160)
 
-    def draw_holes(self, holes):
+        # Draw the game mode with shadow
+        self.draw_text_with_shadow(
+            game_mode,
+            self.font_medium,
+            DARK_ORANGE,
+            BLACK,
+            game_mode_text_position,
+            shadow_offset=(2, 2),
+            center=True,
+            surface=layer,
+        )
+        # Draw the game score with shadow
+        self.draw_text_with_shadow(
+            str(score) + " points",
+            self.font_medium,
+            DARK_ORANGE,
+            BLACK,
+            score_text_position,
+            shadow_offset=(2, 2),
+            center=True,
+            surface=layer,
+        )
+        # Draw the team mode with shadow
+        self.draw_text_with_shadow(
+            team_mode,
+            self.font_medium,
+            DARK_ORANGE,
+            BLACK,
+            team_mode_text_position,
+            shadow_offset=(2, 2),
+            center=True,
+            surface=layer,
+        )
+        self.game_layer = layer
+
+    def draw_holes(self, holes, surface):
         # Define the area for the holes and add chrome border
         holes_area_rect = (
             self.screen_width // 3,
@@ -365,57 +566,46 @@ class Display:
             self.screen_width // 3,
             self.screen_height // 2.4,
         )
-        self.draw_chrome_rect(holes_area_rect, CHROME_COLORS, 20, 5)
+        self.draw_chrome_rect(holes_area_rect, CHROME_COLORS, 20, 5, surface)
 
         # Draw holes
         for hole in holes:
             x1, y1 = hole.position[0], hole.position[1]
 
-            pygame.draw.circle(self.screen, BLACK, (x1, y1), HOLE_RADIUS)
-            pygame.draw.circle(self.screen, RED, (x1, y1), HOLE_RADIUS, 5)
+            pygame.draw.circle(surface, BLACK, (x1, y1), HOLE_RADIUS)
+            pygame.draw.circle(surface, RED, (x1, y1), HOLE_RADIUS, 5)
             font = self.font_medium if hole.type != "large_frog" else self.font_small
-            points_text = font.render(hole.text, True, LIGHT_GREY)
+            points_text = self.text_cache.render(font, hole.text, True, LIGHT_GREY)
             text_rect = points_text.get_rect(center=(x1, y1))
-            self.screen.blit(points_text, text_rect)
+            surface.blit(points_text, text_rect)
 
             if hole.type == "side" or hole.type == "bottle":
                 x2, y2 = hole.position2[0], hole.position2[1]
 
-                pygame.draw.circle(self.screen, BLACK, (x2, y2), HOLE_RADIUS)
-                pygame.draw.circle(self.screen, RED, (x2, y2), HOLE_RADIUS, 5)
+                pygame.draw.circle(surface, BLACK, (x2, y2), HOLE_RADIUS)
+                pygame.draw.circle(surface, RED, (x2, y2), HOLE_RADIUS, 5)
                 text_rect = points_text.get_rect(center=(x2, y2))
-                self.screen.blit(points_text, text_rect)
-
-    def draw_static_elements(
-        self, current_player, score, game_mode, team_mode, holes, only_score=False
-    ):
-        """Draws static elements like scores and game info."""
-        # Define the area for the current player info and add chrome border
-        current_player_rect = (20, 20, self.screen_width / 3 - 40, 200)
+                surface.blit(points_text, text_rect)
 
+    def draw_current_player(self, current_player, score, only_score=False):
+        """Draws the current player panel: name, score and remaining points."""
         # Calculate center positions for the texts within the rectangle
-        rect_x, rect_y, rect_width, rect_height = current_player_rect
+        rect_x, rect_y, rect_width, rect_height = self.current_player_rect
         score_text_position = (rect_x + rect_width / 2, rect_y + 100)
         remaining_points_text_position = (rect_x + rect_width / 2, rect_y + 160)
 
-        # Define text strings
-        current_player_score = f"Score: {current_player.score}"
-        remaining_points_text = f"Points Restants: {score - current_player.score}"
+        remaining_points = score - current_player.score
 
         if only_score:
-            # Render the text to get the dimensions
-            score_surface = self.font_medium.render(
-                current_player_score, True, DARK_ORANGE
+            # Measure the texts to get the dimensions
+            score_rect = pygame.Rect(
+                (0, 0), self.font_medium.size(f"Score: {current_player.score}")
             )
-            remaining_points_surface = self.font_verysmall.render(
-                remaining_points_text, True, DARK_GREEN
-            )
-
-            # Calculate rectangle positions and sizes
-            score_rect = score_surface.get_rect(center=score_text_position)
-            remaining_points_rect = remaining_points_surface.get_rect(
-                center=remaining_points_text_position
+            score_rect.center = score_text_position
+            remaining_points_rect = pygame.Rect(
+                (0, 0), self.font_verysmall.size(f"Points Restants: {remaining_points}")
             )
+            remaining_points_rect.center = remaining_points_text_position
 
             # Add padding around the text for the rectangle
             padding = 10
@@ -426,37 +616,42 @@ class Display:
 
             pygame.draw.rect(self.screen, rectangle_color, score_rect)
             pygame.draw.rect(self.screen, rectangle_color, remaining_points_rect)
+            self.compositor.add(score_rect)
+            self.compositor.add(remaining_points_rect)
 
         # Draw the text with shadow
-        self.draw_text_with_shadow(
-            current_player_score,
-            self.font_medium,
-            DARK_ORANGE,
-            BLACK,
-            score_text_position,
-            shadow_offset=(2, 2),
-            center=True,
+        self.compositor.add(
+            self.draw_number_with_shadow(
+                "Score: ",
+                current_player.score,
+                self.font_medium,
+                DARK_ORANGE,
+                BLACK,
+                score_text_position,
+                shadow_offset=(2, 2),
+                center=True,
+            )
         )
 
-        self.draw_text_with_shadow(
-            remaining_points_text,
-            self.font_verysmall,
-            DARK_GREEN,
-            BLACK,
-            remaining_points_text_position,
-            shadow_offset=(2, 2),
-            center=True,
+        self.compositor.add(
+            self.draw_number_with_shadow(
+                "Points Restants: ",
+                remaining_points,
+                self.font_verysmall,
+                DARK_GREEN,
+                BLACK,
+                remaining_points_text_position,
+                shadow_offset=(2, 2),
+                center=True,
+            )
         )
 
         if not only_score:
-            self.draw_chrome_rect(current_player_rect, CHROME_COLORS, 15, 5)
-
-            current_player_name_text = str(current_player)
             name_text_position = (rect_x + rect_width / 2, rect_y + 40)
 
             # Draw the current player name with shadow
             self.draw_text_with_shadow(
-                current_player_name_text,
+                str(current_player),
                 self.font_large,
                 DARK_GREEN,
                 BLACK,
@@ -465,56 +660,6 @@ class Display:
                 center=True,
             )
 
-            self.draw_holes(holes)
-
-            # Define the area for the game options and add chrome border
-            game_mode_rect = (
-                self.screen_width - (self.screen_width / 3 - 20),
-                20,
-                self.screen_width / 3 - 40,
-                200,
-            )
-            self.draw_chrome_rect(game_mode_rect, CHROME_COLORS, 15, 5)
-
-            # Calculate center positions for the game options texts within the rectangle
-            rect_x, rect_y, rect_width, rect_height = game_mode_rect
-            game_mode_text_position = (rect_x + rect_width / 2, rect_y + 40)
-            score_text_position = (rect_x + rect_width / 2, rect_y + 100)
-            team_mode_text_position = (rect_x + rect_width / 2, rect_y + 160)
-
-            # Draw the game mode with shadow
-            self.draw_text_with_shadow(
-                game_mode,
-                self.font_medium,
-                DARK_ORANGE,
-                BLACK,
-                game_mode_text_position,
-                shadow_offset=(2, 2),
-                center=True,
-            )
-            # Draw the game score with shadow
-            self.draw_text_with_shadow(
-                str(score) + " points",
-                self.font_medium,
-                DARK_ORANGE,
-                BLACK,
-                score_text_position,
-                shadow_offset=(2, 2),
-                center=True,
-            )
-            # Draw the team mode with shadow
-            self.draw_text_with_shadow(
-                team_mode,
-                self.font_medium,
-                DARK_ORANGE,
-                BLACK,
-                team_mode_text_position,
-                shadow_offset=(2, 2),
-                center=True,
-            )
-
-        pygame.display.flip()
-
     def display_grouped_players(
         self, players, team_mode, player_in_team, only_score=False
     ):
@@ -570,7 +715,7 @@ class Display:
         rank_square_size = 25  # Adjusted size to fit better
 
         if display_score:
-            height_score = self.font_small.render("T", True, DARK_GREY)
+            height_score = self.text_cache.render(self.font_small, "T", True, DARK_GREY)
             height_score = height_score.get_height() + 5
         else:
             height_score = 0
@@ -579,13 +724,15 @@ class Display:
             group_color = group_color_map[id(group)]
             group_total_score = sum(player.score for player in group)
 
-            total_score_text = f"Total: {group_total_score}"
-            self.draw_text_with_shadow(
-                total_score_text,
-                self.font_small,
-                DARK_ORANGE,  # Text color
-                pygame.Color("black"),  # Shadow color
-                (x, y),  # Position
+            self.compositor.add(
+                self.draw_number_with_shadow(
+                    "Total: ",
+                    group_total_score,
+                    self.font_small,
+                    DARK_ORANGE,  # Text color
+                    pygame.Color("black"),  # Shadow color
+                    (x, y),  # Position
+                )
             )
 
             # Layout players within the group
@@ -603,6 +750,11 @@ class Display:
                         border_radius,
                         border_width,
                     )
+                    self.compositor.add(
+                        pygame.Rect(x, y + height_score, box_width, box_height).inflate(
+                            2 * border_width, 2 * border_width
+                        )
+                    )
                     pygame.draw.rect(
                         self.screen,
                         group_color,
@@ -618,19 +770,22 @@ class Display:
                         (square_x, square_y, rank_square_size, rank_square_size),
                     )
 
-                    rank_text = self.font_verysmall.render(
-                        f"{player.rank}", True, WHITE
+                    rank_atlas = self.glyph_atlas(self.font_verysmall, WHITE)
+                    rank_text_rect = pygame.Rect(
+                        (0, 0), rank_atlas.size(str(player.rank))
                     )
-                    rank_text_rect = rank_text.get_rect(
-                        center=(
-                            square_x + rank_square_size / 2,
-                            square_y + rank_square_size / 2,
-                        )
+                    rank_text_rect.center = (
+                        square_x + rank_square_size / 2,
+                        square_y + rank_square_size / 2,
+                    )
+                    rank_atlas.draw(
+                        self.screen, str(player.rank), rank_text_rect.topleft
                     )
-                    self.screen.blit(rank_text, rank_text_rect)
 
                     # Player details
-                    player_label = self.font_small.render(str(player), True, DARK_GREY)
+                    player_label = self.text_cache.render(
+                        self.font_small, str(player), True, DARK_GREY
+                    )
                     player_label_pos = (
                         x + 10,
                         y
@@ -648,8 +803,9 @@ class Display:
                         + height_score
                         + (box_height - player_label.get_height()) // 2,
                     )
-                    self.draw_text_with_shadow(
-                        str(player.score),
+                    self.draw_number_with_shadow(
+                        "",
+                        player.score,
                         self.font_small,
                         DARK_GREY,
                         WHITE,
@@ -697,7 +853,56 @@ class Display:
                     x = start_x
                     y += box_height + gap_between_boxes + height_score
 
-        pygame.display.flip()
+    def glyph_atlas(self, font, color):
+        key = (font, tuple(color))
+        if key not in self.glyph_atlases:
+            self.glyph_atlases[key] = GlyphAtlas(font, color)
+        return self.glyph_atlases[key]
+
+    def draw_number_with_shadow(
+        self,
+        label,
+        value,
+        font,
+        text_color,
+        shadow_color,
+        position,
+        shadow_offset=(2, 2),
+        center=False,
+        surface=None,
+    ):
+        """
+        Same as draw_text_with_shadow for label followed by the number value,
+        whose digits are blitted from glyph atlases instead of rendered.
+        """
+        if surface is None:
+            surface = self.screen
+        number = str(value)
+        atlas = self.glyph_atlas(font, text_color)
+        label_width = font.size(label)[0] if label else 0
+        number_width, height = atlas.size(number)
+        x, y = position
+        if center:
+            x, y = x - (label_width + number_width) // 2, y - height // 2
+        area = pygame.Rect(x, y, label_width + number_width, height)
+        if label:
+            area.union_ip(
+                self.draw_text_with_shadow(
+                    label,
+                    font,
+                    text_color,
+                    shadow_color,
+                    (x, y),
+                    shadow_offset,
+                    surface=surface,
+                )
+            )
+        number_position = (x + label_width + shadow_offset[0], y + shadow_offset[1])
+        area.union_ip(
+            self.glyph_atlas(font, shadow_color).draw(surface, number, number_position)
+        )
+        area.union_ip(atlas.draw(surface, number, (x + label_width, y)))
+        return area
 
     def draw_text_with_shadow(
         self,
@@ -708,6 +913,7 @@ class Display:
         position,
         shadow_offset=(2, 2),
         center=False,
+        surface=None,
     ):
         """
         Renders text with a shadow effect.
@@ -718,27 +924,19 @@ class Display:
         :param position: The position to render the text.
         :param shadow_offset: The offset of the shadow from the text.
         :param center: Whether to center the text at the given position.
+        :param surface: The surface to draw on, the screen by default.
+        :return: The area covered by the text and its shadow.
         """
-        shadow_text = font.render(text, True, shadow_color)
-        shadow_position = (
-            position[0] + shadow_offset[0],
-            position[1] + shadow_offset[1],
+        if surface is None:
+            surface = self.screen
+        text_surface, origin = self.text_cache.render_shadowed(
+            font, text, text_color, shadow_color, shadow_offset
         )
+        x, y = position
         if center:
-            shadow_position = (
-                shadow_position[0] - shadow_text.get_width() // 2,
-                shadow_position[1] - shadow_text.get_height() // 2,
-            )
-        self.screen.blit(shadow_text, shadow_position)
-
-        actual_text = font.render(text, True, text_color)
-        actual_position = position
-        if center:
-            actual_position = (
-                actual_position[0] - actual_text.get_width() // 2,
-                actual_position[1] - actual_text.get_height() // 2,
-            )
-        self.screen.blit(actual_text, actual_position)
+            text_width, text_height = font.size(text)
+            x, y = x - text_width // 2, y - text_height // 2
+        return surface.blit(text_surface, (x - origin[0], y - origin[1]))
 
     def draw_player(self, x, y, player, box_width, box_height, group_color):
         """Draws individual player boxes and details."""
@@ -757,8 +955,12 @@ class Display:
             border_radius=5,
         )
 
-        player_label = self.font_small.render(str(player), True, DARK_GREY)
-        score_text = self.font_medium.render(str(player.score), True, DARK_GREY)
+        player_label = self.text_cache.render(
+            self.font_small, str(player), True, DARK_GREY
+        )
+        score_text = self.text_cache.render(
+            self.font_medium, str(player.score), True, DARK_GREY
+        )
         self.screen.blit(player_label, (x + 10, y + 10))
         self.screen.blit(score_text, (x + 10, y + 30))
 
@@ -776,54 +978,88 @@ class Display:
             return len(group)
         return 4
 
+    def animating(self):
+        """True while an exclusive animation owns the screen."""
+        return self.timeline.busy
+
+    def begin_frame(self):
+        """Undoes the particles of the previous frame, before anything is drawn."""
+        self.particles.erase()
+
+    def drop_overlays(self):
+        """
+        Stops the particles and the other overlays, for scenes that do not
+        advance the animations: left in the timeline they would stay frozen
+        there and keep the game from going idle.
+        """
+        self.particles.stop()
+        self.timeline.clear_overlays()
+
+    def update_animations(self):
+        """Advances the running animations by one frame, True if one ended."""
+        if not self.timeline.active:
+            return False
+        return self.timeline.update(time.monotonic(), self.screen, self.compositor)
+
+    def present(self):
+        """Shows everything drawn during the frame with one display update."""
+        if self.compositor.present():
+            self.latency.presented()
+
     def draw_goal_animation(self, hole):
-        start_time = time.time()
-        current_color = WHITE
-        last_blink_time = start_time
-        x1, y1 = hole.position
-        x2, y2 = hole.position2
-
-        while time.time() - start_time < 1.5:
-            current_time = time.time()
-            if current_time - last_blink_time > BLINK_INTERVAL:
-                # Toggle the color
-                current_color = RED if current_color == DARK_ORANGE else DARK_ORANGE
-                last_blink_time = current_time
-
-            # Draw the border with specified thickness
-            pygame.draw.circle(self.screen, current_color, (x1, y1), HOLE_RADIUS, 5)
-            if hole.type in ["side", "bottle"]:
-                # Draw the border with specified thickness
-                pygame.draw.circle(self.screen, current_color, (x2, y2), HOLE_RADIUS, 5)
-
-            # Update the display
-            pygame.display.flip()
-
-        pygame.draw.circle(self.screen, RED, (x1, y1), HOLE_RADIUS, 5)
+        positions = [hole.position]
         if hole.type in ["side", "bottle"]:
-            # Draw the border with specified thickness
-            pygame.draw.circle(self.screen, RED, (x2, y2), HOLE_RADIUS, 5)
+            positions.append(hole.position2)
+        for position in positions:
+            self.particles.burst(
+                position,
+                HIT_BURST_COLORS[hole.type],
+                HIT_BURST_PARTICLES[hole.type] // len(positions),
+                HIT_BURST_LIFESPAN,
+            )
+        # Frog holes blink before their GIF takes the screen, as an overlay
+        # the ring would be drawn over the GIF
+        self.timeline.play(
+            TimedAnimation(
+                1.5,
+                lambda elapsed: self.draw_goal_frame(hole, elapsed),
+                exclusive=hole.type in ["little_frog", "large_frog"],
+            )
+        )
 
-        # Update the display
-        pygame.display.flip()
+    def draw_goal_frame(self, hole, elapsed):
+        # Toggle the color every BLINK_INTERVAL, then settle back on red
+        blinks = int(elapsed / BLINK_INTERVAL)
+        if elapsed >= 1.5:
+            current_color = RED
+        elif blinks == 0:
+            current_color = WHITE
+        else:
+            current_color = DARK_ORANGE if blinks % 2 else RED
 
-    def draw_penalty(self):
-        self.penalty_sound.play()
-        self.play_gif(self.penalty_frames, self.penalty_duration)
-        self.play_gif(self.penalty_frames, self.penalty_duration)
-        roulette_animation = RouletteAnimation(self.screen, "null")
-        points = roulette_animation.run()
+        # Draw the border with specified thickness
+        dirty_rect = pygame.draw.circle(
+            self.screen, current_color, hole.position, HOLE_RADIUS, 5
+        )
+        if hole.type in ["side", "bottle"]:
+            dirty_rect.union_ip(
+                pygame.draw.circle(
+                    self.screen, current_color, hole.position2, HOLE_RADIUS, 5
+                )
+            )
+        return dirty_rect
 
-        return points
+    def draw_penalty(self, on_result):
+        self.play_gif(self.penalty_clip, on_start=partial(self.sounds.play, "penalty"))
+        self.play_gif(self.penalty_clip)
+        self.timeline.play(self.roulette("null").spin(on_result))
 
     def draw_player_win(self, winner):
-        # Determine the winner and message
-        self.aplause.play()
-        BLINK_INTERVAL = 0.5  # Interval in seconds
-
         # Message and font
         message = f"Bravo {winner}"
-        text_surface = self.font_large.render(message, True, DARK_ORANGE)
+        text_surface = self.text_cache.render(
+            self.font_large, message, True, DARK_ORANGE
+        )
         text_rect = text_surface.get_rect(
             center=(self.screen.get_width() // 2, self.screen.get_height() // 2)
         )
@@ -856,30 +1092,22 @@ class Display:
             frame_rect.height + 40,
         )
 
-        # Blinking effect
-        start_time = time.time()
-        while time.time() - start_time < 3:
-            blink = int(
-                (time.time() * 2) % 2
-            )  # Toggle between 0 and 1 every 0.5 seconds
-
+        def draw_frame(elapsed):
             # Clear the screen area
-            self.screen.fill((0, 0, 0), clear_rect)  # Adjust as necessary
+            self.screen.fill((0, 0, 0), clear_rect)
 
-            if blink:
+            # Blink every 0.5 seconds, the final state stays visible
+            if elapsed >= 3 or int(elapsed * 2) % 2 == 0:
                 # Draw the winner frame
                 self.draw_chrome_rect(frame_rect, GOLD_COLORS, 10, 5)
 
                 # Draw the text with shadow centered within the frame
-                text_center_x = frame_rect.centerx
-                text_center_y = frame_rect.centery
-
                 self.draw_text_with_shadow(
                     message,
                     self.font_large,
                     DARK_ORANGE,
                     BLACK,
-                    (text_center_x, text_center_y),
+                    frame_rect.center,
                     shadow_offset=(2, 2),
                     center=True,
                 )
@@ -887,33 +1115,30 @@ class Display:
                 # Draw the winner banner images
                 self.screen.blit(self.winner_banner, left_image_rect)
                 self.screen.blit(self.winner_banner, right_image_rect)
-
-            pygame.display.update()
-            time.sleep(BLINK_INTERVAL)
-
-        # Ensure the final state is visible
-        self.draw_chrome_rect(frame_rect, GOLD_COLORS, 10, 5)
-        text_center_x = frame_rect.centerx
-        text_center_y = frame_rect.centery
-
-        self.draw_text_with_shadow(
-            message,
-            self.font_large,
-            DARK_ORANGE,
-            BLACK,
-            (text_center_x, text_center_y),
-            shadow_offset=(2, 2),
-            center=True,
+            return clear_rect
+
+        self.timeline.play(
+            TimedAnimation(
+                3,
+                draw_frame,
+                on_start=partial(self.sounds.play, "aplause"),
+                on_finish=partial(self.sounds.stop, "aplause"),
+            )
         )
 
-        self.screen.blit(self.winner_banner, left_image_rect)
-        self.screen.blit(self.winner_banner, right_image_rect)
-        pygame.display.update()
-        self.aplause.stop()
-
     def draw_win(self, players, team_mode):
-        self.win_sound.play()
-        self.run_fireworks()
+        self.timeline.play(
+            FireworksAnimation(
+                self.screen,
+                self.particles,
+                on_start=partial(self.sounds.play, "win"),
+                on_finish=lambda: self.draw_win_screen(players, team_mode),
+            )
+        )
+        # Leave the ranking on screen before the end menu
+        self.timeline.play(TimedAnimation(5))
+
+    def draw_win_screen(self, players, team_mode):
         self.screen.blit(self.win_background, (0, 0))
 
         # Group players by team or pairs
@@ -944,7 +1169,9 @@ class Display:
             winner = next((player for player in players if player.rank == 1), None)
             message = f"Bravo {winner}" if winner else "Game Over!"
 
-        text_surface = self.font_large.render(message, True, DARK_ORANGE)
+        text_surface = self.text_cache.render(
+            self.font_large, message, True, DARK_ORANGE
+        )
         text_rect = text_surface.get_rect(center=(self.screen.get_width() // 2, 70))
 
         frame_margin = 20
@@ -1040,9 +1267,15 @@ class Display:
                     (x, y, box_width, box_height), CHROME_COLORS, 10, 5
                 )
 
-                player_label = self.font_small.render(str(player), True, WHITE)
-                score_text = self.font_medium.render(f"{player.score}", True, WHITE)
-                rank_text = self.font_small.render(f"{player.rank}", True, WHITE)
+                player_label = self.text_cache.render(
+                    self.font_small, str(player), True, WHITE
+                )
+                score_text = self.text_cache.render(
+                    self.font_medium, f"{player.score}", True, WHITE
+                )
+                rank_text = self.text_cache.render(
+                    self.font_small, f"{player.rank}", True, WHITE
+                )
 
                 player_label_y = y + (box_height - player_label.get_height()) // 2
                 score_text_y = y + (box_height - score_text.get_height()) // 2
@@ -1066,7 +1299,7 @@ class Display:
                 x += hor_gap + box_width
                 y = margin_top
 
-        pygame.display.flip()
+        self.compositor.add_full()
 
     def group_players(self, players, attribute):
         groups = {}
@@ -1078,134 +1311,94 @@ class Display:
         return list(groups.values())
 
     def animation_bottle(self):
-        sound = self.load_sound("sounds", "bouteille.mp3")
-        sound.play()
+        self.sounds.play("bottle")
 
     def animation_little_frog(self):
-        self.aplause.play()
-        self.play_gif(self.little_frog_frames, self.little_frog_duration)
-        self.aplause.stop()
+        self.play_gif(
+            self.little_frog_clip,
+            on_start=partial(self.sounds.play, "aplause"),
+            on_finish=partial(self.sounds.stop, "aplause"),
+        )
 
-    def animation_large_frog(self):
-        self.aplause.play()
-        self.play_gif(self.large_frog_frames, self.large_frog_duration)
-        roulette_animation = RouletteAnimation(self.screen, "frog")
-        self.aplause.stop()
-        return roulette_animation.run()
+    def animation_large_frog(self, on_result):
+        self.play_gif(
+            self.large_frog_clip,
+            on_start=partial(self.sounds.play, "aplause"),
+            on_finish=partial(self.sounds.stop, "aplause"),
+        )
+        self.timeline.play(self.roulette("frog").spin(on_result))
+
+    def roulette(self, type):
+        """The roulette of type, built on first use and reused for every spin."""
+        if type not in self.roulettes:
+            self.roulettes[type] = RouletteAnimation(
+                self.screen, self.asset(f"{type}_roulette_wheel"), self.sounds
+            )
+        return self.roulettes[type]
 
     def load_gif(self, folder, filename):
-        # Load GIF using PIL
         gif_path = os.path.join(
             os.path.dirname(__file__), "..", "assets", folder, filename
         )
-        gif = Image.open(gif_path)
-        frames = []
-        try:
-            while True:
-                frame = gif.copy().convert("RGBA")  # Convert to RGBA for consistency
-                frames.append(frame)
-                gif.seek(len(frames))  # Move to the next frame
-        except EOFError:
-            pass
-        return frames, gif.info["duration"]
-
-    def play_gif(self, frames, duration):
-        clock = pygame.time.Clock()
-        frame_index = 0
-        running = True
-
-        # Get screen dimensions
-        screen_width, screen_height = self.screen.get_size()
-
+        key = f"{folder}/{filename}"
+        clip = self.assets and self.assets.clip(key)
+        if clip is not None:
+            return clip
+        clip = GifClip.load(gif_path, self.gif_area_size())
+        if self.bake:
+            self.bake.add_clip(key, gif_path, clip)
+        return clip
+
+    def gif_area_size(self):
         # Get the maximum width and height based on the hole radius and holes_area_rect
-        max_width = screen_width // 3
-        max_height = screen_height // 2.4
-
-        while running and frame_index < len(frames):
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-
-            # Get the current frame
-            frame = frames[frame_index]
-            mode, size = frame.mode, frame.size
-            data = frame.tobytes()
-
-            # Resize the frame to fit within the maximum dimensions
-            frame_width, frame_height = size
-            if frame_width > max_width or frame_height > max_height:
-                scale = min(max_width / frame_width, max_height / frame_height)
-                frame = frame.resize(
-                    (int(frame_width * scale), int(frame_height * scale)),
-                    Image.Resampling.LANCZOS,
-                )
-                frame_width, frame_height = frame.size
-            data = frame.tobytes()
-            surface = pygame.image.fromstring(data, frame.size, mode)
-
-            # Calculate position to center the frame in the hole area
-            x, y = (
-                max_width + (max_width / 2) - frame_width / 2,
-                20 + max_height / 2 - frame_height / 2,
+        screen_width, screen_height = self.screen.get_size()
+        return screen_width // 3, screen_height // 2.4
+
+    def play_gif(self, clip, on_start=None, on_finish=None):
+        self.timeline.play(
+            TimedAnimation(
+                clip.duration,
+                lambda elapsed: self.draw_gif_frame(clip, elapsed),
+                on_start=on_start,
+                on_finish=on_finish,
             )
+        )
 
-            # Define the rectangle area for the GIF
-            padding = 10
-            rect_x, rect_y, rect_width, rect_height = (
-                x - padding,
-                y - padding,
-                frame_width + 2 * padding,
-                frame_height + 2 * padding,
-            )
+    def draw_gif_frame(self, clip, elapsed):
+        max_width, max_height = self.gif_area_size()
+        surface = clip.frame_at(elapsed)
+        frame_width, frame_height = surface.get_size()
 
-            # Clear the previous frame area
-            self.screen.fill((0, 0, 0), (rect_x, rect_y, rect_width, rect_height))
+        # Calculate position to center the frame in the hole area
+        x, y = (
+            max_width + (max_width / 2) - frame_width / 2,
+            20 + max_height / 2 - frame_height / 2,
+        )
 
-            # Draw the white rectangle with a black border
-            pygame.draw.rect(
-                self.screen,
-                BLACK,
-                (rect_x, rect_y, rect_width, rect_height),
-            )
-            pygame.draw.rect(
-                self.screen,
-                WHITE,
-                (rect_x + 1, rect_y + 1, rect_width - 2, rect_height - 2),
-            )
+        # Define the rectangle area for the GIF
+        padding = 10
+        rect_x, rect_y, rect_width, rect_height = (
+            x - padding,
+            y - padding,
+            frame_width + 2 * padding,
+            frame_height + 2 * padding,
+        )
 
-            # Draw the frame
-            self.screen.blit(surface, (x, y))
-            pygame.display.flip()
+        # Clear the previous frame area
+        self.screen.fill((0, 0, 0), (rect_x, rect_y, rect_width, rect_height))
 
-            frame_index += 1
-            clock.tick(1000 // duration)
+        # Draw the white rectangle with a black border
+        pygame.draw.rect(
+            self.screen,
+            BLACK,
+            (rect_x, rect_y, rect_width, rect_height),
+        )
+        pygame.draw.rect(
+            self.screen,
+            WHITE,
+            (rect_x + 1, rect_y + 1, rect_width - 2, rect_height - 2),
+        )
 
-        # Draw the final frame
+        # Draw the frame
         self.screen.blit(surface, (x, y))
-        pygame.display.flip()
-
-    def create_fireworks(self, num_fireworks):
-        for _ in range(num_fireworks):
-            x = random.randint(100, self.screen.get_width() - 100)
-            y = random.randint(100, self.screen.get_height() - 100)
-            color = [random.randint(0, 255) for _ in range(3)]
-            self.fireworks.append(Firework(x, y, color, num_particles=50))
-
-    def run_fireworks(self):
-        self.fireworks = []
-        self.create_fireworks(5)
-        running = True
-        clock = pygame.time.Clock()
-        while running and self.fireworks:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                    break
-
-            self.screen.fill((0, 0, 0))
-            for firework in self.fireworks:
-                firework.update()
-                firework.draw(self.screen)
-            self.fireworks = [f for f in self.fireworks if not f.is_dead()]
-            pygame.display.flip()
-            clock.tick(30)
+        return pygame.Rect(rect_x, rect_y, rect_width, rect_height)
@@ -1,46 +1,344 @@
+import logging
+
+import numpy as np
 import pygame
-import random
-import sys
-import math
-
-
-class FireworkParticle:
-    def __init__(self, x, y, color):
-        self.x = x
-        self.y = y
-        self.radius = random.randint(2, 4)
-        self.color = color
-        self.velocity_x = random.uniform(-3, 3)
-        self.velocity_y = random.uniform(-3, 3)
-        self.gravity = 0.1
-        self.lifespan = 255
-
-    def update(self):
-        self.velocity_y += self.gravity
-        self.x += self.velocity_x
-        self.y += self.velocity_y
-        self.lifespan -= 2
+from src.animation import Animation
+from src.constants import (
+    FIREWORK_BURSTS,
+    FIREWORK_LAUNCH_WINDOW,
+    FIREWORK_LIFESPAN,
+    FIREWORK_PARTICLES,
+    PARTICLE_POOL_SIZE,
+    PARTICLE_STEP,
+)
 
-    def draw(self, screen):
-        if self.lifespan > 0:
-            alpha = max(0, min(255, self.lifespan))
-            particle_color = (*self.color, alpha)
+PARTICLE_SPEED = 90  # px/s, fastest particle of a burst
+PARTICLE_GRAVITY = 90  # px/s²
+PARTICLE_RADII = (2, 3, 4)
+MAX_CATCH_UP_STEPS = 6  # Simulated steps per frame at most, the rest is dropped
+
+
+def disc_offsets(radius, pitch):
+    """Offsets of the pixels of a disc of radius, on rows of pitch pixels."""
+    span = np.arange(-radius, radius + 1)
+    inside = np.add.outer(span**2, span**2) <= radius**2
+    y, x = np.nonzero(inside)
+    return (y - radius) * pitch + (x - radius)
+
+
+class ParticleSystem:
+    """
+    Particles of one radius kept as NumPy struct-of-arrays, one row per
+    component (x, y, velocities, life, decay, red, green, blue), in buffers
+    allocated once along with every scratch buffer a step or a draw needs.
+    They are all moved in one vectorized step and drawn with one batched
+    write. The color of a particle is scaled by its remaining life, so it
+    fades out without per-pixel alpha. Particles leaving the screen are
+    dropped. On a 32 bits screen pixels are written straight into the screen
+    buffer, other depths go through pygame.draw one particle at a time.
+    """
+
+    def __init__(self, capacity, radius, screen, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.capacity = capacity
+        self.radius = radius
+        self.width, self.height = screen.get_size()
+        self.pitch = screen.get_pitch() // screen.get_bytesize()
+        self.shifts = screen.get_shifts()[:3]
+        self.offsets = disc_offsets(radius, self.pitch)
+        self.count = 0
+
+        self.position = np.zeros((2, capacity), np.float32)
+        self.velocity = np.zeros((2, capacity), np.float32)
+        self.life = np.zeros(capacity, np.float32)  # 1 when emitted, dead at 0
+        self.decay = np.zeros(capacity, np.float32)  # life lost per second
+        self.color = np.zeros((3, capacity), np.float32)
+        self.arrays = (self.position, self.velocity, self.life, self.decay, self.color)
+
+        # Scratch buffers, nothing is allocated once the system is built
+        self.spares = tuple(np.zeros_like(array) for array in self.arrays)
+        self.random = np.zeros(capacity, np.float32)
+        self.living = np.zeros(capacity, bool)
+        self.inside = np.zeros(capacity, bool)
+        self.pixel_x = np.zeros(capacity, np.intp)
+        self.pixel_y = np.zeros(capacity, np.intp)
+        self.pixel_index = np.zeros(capacity, np.intp)
+        self.disc_index = np.zeros(capacity, np.intp)
+        self.shade = np.zeros(capacity, np.float32)
+        self.channel = np.zeros(capacity, np.uint32)
+        self.pixel_values = np.zeros(capacity, np.uint32)
+
+    def emit(self, x, y, color, count, lifespan):
+        """Bursts count particles of color from (x, y), within capacity."""
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return
+        new = slice(self.count, self.count + count)
+        random = self.random[:count]
+        self.rng.random(dtype=np.float32, out=random)
+        random *= 2 * np.pi
+        np.cos(random, out=self.velocity[0, new])
+        np.sin(random, out=self.velocity[1, new])
+        # Speeds between 20% and 100% of PARTICLE_SPEED
+        self.rng.random(dtype=np.float32, out=random)
+        random *= 0.8 * PARTICLE_SPEED
+        random += 0.2 * PARTICLE_SPEED
+        self.velocity[0, new] *= random
+        self.velocity[1, new] *= random
+        # Lifespans between 80% and 120% of lifespan
+        self.rng.random(dtype=np.float32, out=random)
+        random *= 0.4 * lifespan
+        random += 0.8 * lifespan
+        np.reciprocal(random, out=self.decay[new])
+        self.position[0, new] = x
+        self.position[1, new] = y
+        self.life[new] = 1
+        for component, value in zip(self.color, color):
+            component[new] = value
+        self.count += count
+
+    def step(self, dt):
+        count = self.count
+        if not count:
+            return
+        moves = self.random[:count]
+        self.velocity[1, :count] += PARTICLE_GRAVITY * dt
+        for axis in range(2):
+            np.multiply(self.velocity[axis, :count], dt, out=moves)
+            self.position[axis, :count] += moves
+        np.multiply(self.decay[:count], dt, out=moves)
+        self.life[:count] -= moves
+
+        # Alive and far enough from the edges to draw the whole disc
+        living, inside = self.living[:count], self.inside[:count]
+        np.greater(self.life[:count], 0, out=living)
+        for axis, size in ((0, self.width), (1, self.height)):
+            np.greater_equal(self.position[axis, :count], self.radius, out=inside)
+            living &= inside
+            np.less(self.position[axis, :count], size - self.radius, out=inside)
+            living &= inside
+
+        alive = int(np.count_nonzero(living))
+        if alive < count:
+            # Compact the living particles at the start of the buffers
+            for array, spare in zip(self.arrays, self.spares):
+                np.compress(living, array[..., :count], axis=-1, out=spare[..., :alive])
+                array[..., :alive] = spare[..., :alive]
+            self.count = alive
+
+    def clear(self):
+        self.count = 0
+
+    def bounds(self):
+        """Area the particles cover, None without particles."""
+        count = self.count
+        if not count:
+            return None
+        pixel_x, pixel_y = self.pixel_x[:count], self.pixel_y[:count]
+        np.copyto(pixel_x, self.position[0, :count], casting="unsafe")
+        np.copyto(pixel_y, self.position[1, :count], casting="unsafe")
+        left = int(pixel_x.min()) - self.radius
+        top = int(pixel_y.min()) - self.radius
+        return pygame.Rect(
+            left,
+            top,
+            int(pixel_x.max()) + self.radius + 1 - left,
+            int(pixel_y.max()) + self.radius + 1 - top,
+        )
+
+    def draw_circles(self, surface):
+        """Slow path of draw() for screens that are not 32 bits."""
+        # self.pixel_x and self.pixel_y were filled by bounds()
+        for index in range(self.count):
+            life = self.life[index]
             pygame.draw.circle(
-                screen, particle_color, (int(self.x), int(self.y)), self.radius
+                surface,
+                [int(component[index] * life) for component in self.color],
+                (int(self.pixel_x[index]), int(self.pixel_y[index])),
+                self.radius,
+            )
+
+    def draw(self, pixels):
+        """Writes the particles into pixels, the screen buffer as uint32."""
+        count = self.count
+        if not count:
+            return
+        # self.pixel_x and self.pixel_y were filled by bounds()
+        pixel_index = self.pixel_index[:count]
+        np.multiply(self.pixel_y[:count], self.pitch, out=pixel_index)
+        pixel_index += self.pixel_x[:count]
+
+        # Faded color mapped to the screen pixel format
+        shade, channel = self.shade[:count], self.channel[:count]
+        pixel_values = self.pixel_values[:count]
+        pixel_values[:] = 0
+        for component, shift in zip(self.color, self.shifts):
+            np.multiply(component[:count], self.life[:count], out=shade)
+            np.copyto(channel, shade, casting="unsafe")
+            channel <<= shift
+            pixel_values |= channel
+
+        # One write of every particle per pixel of the disc
+        disc_index = self.disc_index[:count]
+        for offset in self.offsets:
+            np.add(pixel_index, offset, out=disc_index)
+            np.put(pixels, disc_index, pixel_values)
+
+
+class ParticleEffects(Animation):
+    """
+    Pool of particle storage shared by every particle effect of the game,
+    allocated once and recycled across bursts and games. It plays as an
+    overlay, so bursts never block the scene they are drawn over, while
+    particles remain. The simulation advances in fixed PARTICLE_STEP steps,
+    whatever the frame rate. The screen under the particles is saved before
+    drawing them and put back by erase() at the start of the next frame,
+    before the scene draws over it.
+    """
+
+    def __init__(
+        self, screen, timeline, compositor, capacity=PARTICLE_POOL_SIZE, rng=None
+    ):
+        # Particles go straight into the screen buffer only on 32 bits screens
+        self.direct = screen.get_bytesize() == 4
+        if not self.direct:
+            logging.warning(
+                f"{screen.get_bitsize()} bits screen, particles are drawn one by one"
             )
+        super().__init__(exclusive=False)
+        self.screen = screen
+        self.timeline = timeline
+        self.compositor = compositor
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.systems = [
+            ParticleSystem(capacity // len(PARTICLE_RADII), radius, screen, self.rng)
+            for radius in PARTICLE_RADII
+        ]
+        self.background = pygame.Surface(screen.get_size()).convert(screen)
+        self.area = None
+
+    @property
+    def count(self):
+        return sum(system.count for system in self.systems)
+
+    def burst(self, position, color, count, lifespan=FIREWORK_LIFESPAN):
+        """Bursts count particles from position, starting the overlay if needed."""
+        if not self.timeline.playing(self):
+            # Particles left by an overlay dropped with Timeline.clear
+            for system in self.systems:
+                system.clear()
+            self.start_time = None
+            self.timeline.play(self)
+        x, y = position
+        share, extra = divmod(count, len(self.systems))
+        for index, system in enumerate(self.systems):
+            system.emit(x, y, color, share + (index < extra), lifespan)
+
+    def start(self, now):
+        super().start(now)
+        self.clock = now
+        self.area = None
 
+    def update(self, now):
+        steps = int((now - self.clock) / PARTICLE_STEP)
+        if steps > MAX_CATCH_UP_STEPS:
+            # Too far behind, the simulation skips time instead of stalling
+            self.clock = now - MAX_CATCH_UP_STEPS * PARTICLE_STEP
+            steps = MAX_CATCH_UP_STEPS
+        for _ in range(steps):
+            for system in self.systems:
+                system.step(PARTICLE_STEP)
+        self.clock += steps * PARTICLE_STEP
+        return self.count > 0
 
-class Firework:
-    def __init__(self, x, y, color, num_particles):
-        self.particles = [FireworkParticle(x, y, color) for _ in range(num_particles)]
+    def stop(self):
+        """Drops every particle, for scenes that do not play the overlay."""
+        for system in self.systems:
+            system.clear()
+        self.area = None
 
-    def update(self):
-        for particle in self.particles:
-            particle.update()
+    def erase(self):
+        """Puts back the screen under the particles of the previous frame."""
+        if self.area is None or not self.timeline.playing(self):
+            return
+        self.screen.blit(self.background, self.area, self.area)
+        self.compositor.add(self.area)
+        self.area = None
 
     def draw(self, screen):
-        for particle in self.particles:
-            particle.draw(screen)
+        self.area = None
+        for system in self.systems:
+            bounds = system.bounds()
+            if bounds is not None:
+                self.area = bounds if self.area is None else self.area.union(bounds)
+        if self.area is None:
+            return None
 
-    def is_dead(self):
-        return all(particle.lifespan <= 0 for particle in self.particles)
+        self.background.blit(screen, self.area, self.area)
+        if not self.direct:
+            for system in self.systems:
+                system.draw_circles(screen)
+            return self.area
+        screen_buffer = screen.get_buffer()
+        pixels = np.frombuffer(screen_buffer, np.uint32)
+        for system in self.systems:
+            system.draw(pixels)
+        del pixels, screen_buffer  # Unlocks the screen
+        return self.area
+
+
+class FireworksAnimation(Animation):
+    """
+    Full screen fireworks launched into the shared particle effects at
+    random times over the launch window, over once every particle faded.
+    """
+
+    def __init__(
+        self,
+        screen,
+        effects,
+        num_fireworks=FIREWORK_BURSTS,
+        num_particles=FIREWORK_PARTICLES,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.screen = screen
+        self.effects = effects
+        self.rng = effects.rng
+        self.num_particles = num_particles
+        self.launch_times = np.zeros(num_fireworks)
+        self.launched = num_fireworks
+
+    def start(self, now):
+        super().start(now)
+        self.rng.random(out=self.launch_times)
+        self.launch_times *= FIREWORK_LAUNCH_WINDOW
+        self.launch_times += now
+        self.launch_times.sort()
+        self.launched = 0
+        self.screen_cleared = False
+
+    def update(self, now):
+        width, height = self.screen.get_size()
+        while (
+            self.launched < len(self.launch_times)
+            and self.launch_times[self.launched] <= now
+        ):
+            self.launched += 1
+            self.effects.burst(
+                (
+                    self.rng.integers(100, width - 100),
+                    self.rng.integers(100, height - 100),
+                ),
+                self.rng.integers(0, 256, 3),
+                self.num_particles,
+            )
+        return self.launched < len(self.launch_times) or self.effects.count > 0
+
+    def draw(self, screen):
+        # The particles are drawn by the effects overlay, over the black screen
+        if self.screen_cleared:
+            return None
+        screen.fill((0, 0, 0))
+        self.screen_cleared = True
+        return screen.get_rect()
@@ -0,0 +1,35 @@
+import os
+
+import pygame
+
+GAME_FONT = os.path.join(
+    os.path.dirname(__file__), "..", "assets", "fonts", "AntonSC-Regular.ttf"
+)
+
+
+class FontRegistry:
+    """
+    Loads each (face, size) font once. face is a font file path, or None for
+    pygame's default font. Parsing a TTF is slow, fonts must never be built
+    while drawing a frame.
+    """
+
+    def __init__(self):
+        self.fonts = {}
+        self.specs = {}
+
+    def get(self, face, size):
+        font = self.fonts.get((face, size))
+        if font is None:
+            font = pygame.font.Font(face, size)
+            self.fonts[(face, size)] = font
+            self.specs[font] = (face, size)
+        return font
+
+    def resized(self, font, delta):
+        """Same face as font, delta points larger."""
+        face, size = self.specs[font]
+        return self.get(face, size + delta)
+
+
+font_registry = FontRegistry()
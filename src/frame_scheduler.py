@@ -0,0 +1,55 @@
+import logging
+import statistics
+from collections import deque
+
+import pygame
+
+from src.constants import FPS, SCENE_FPS
+
+
+class FrameScheduler:
+    """
+    Single clock pacing every scene of the game. Each scene has its own
+    target rate and keeps a window of measured frame times.
+    """
+
+    def __init__(self, rates=SCENE_FPS, window=300):
+        self.clock = pygame.time.Clock()
+        self.rates = dict(rates)
+        self.window = window
+        self.frame_times = {}
+
+    def tick(self, scene, rate=None):
+        """Waits for the next frame of scene, returns the frame time in ms."""
+        frame_time = self.clock.tick(rate or self.rates.get(scene, FPS))
+        if scene not in self.frame_times:
+            self.frame_times[scene] = deque(maxlen=self.window)
+        self.frame_times[scene].append(frame_time)
+        return frame_time
+
+    def resync(self):
+        """Restarts the frame clock after an idle wait, which is not a frame."""
+        self.clock.tick()
+
+    def stats(self, scene):
+        """Returns (mean frame time, jitter, worst frame time) in ms."""
+        frame_times = self.frame_times.get(scene)
+        if not frame_times:
+            return 0, 0, 0
+        jitter = statistics.pstdev(frame_times) if len(frame_times) > 1 else 0
+        return statistics.fmean(frame_times), jitter, max(frame_times)
+
+    def report(self):
+        lines = []
+        for scene in sorted(self.frame_times):
+            mean, jitter, worst = self.stats(scene)
+            lines.append(
+                f"{scene}: target={self.rates.get(scene, FPS)}fps "
+                f"frame={mean:.1f}ms jitter={jitter:.1f}ms worst={worst}ms"
+            )
+        return lines
+
+    def dump(self):
+        logging.info("Frame pacing:")
+        for line in self.report() or ["no frame"]:
+            logging.info(f"  {line}")
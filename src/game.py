@@ -3,6 +3,8 @@ import sys
 import logging
 import time
 import os
+import signal
+from collections import deque
 from src.constants import (
     PIN_BENTER,
     PIN_BNEXT,
@@ -19,39 +21,160 @@ from src.constants import (
     PIN_HLFROG,
     PIN_HSFROG,
     ACTION_COOLDOWN,
-    FPS,
+    IDLE_TIMEOUT,
+    IDLE_WAKE_INTERVAL,
+    IDLE_KEYBOARD_INTERVAL,
 )
 from src.pin import PIN
+from src.debounce import PinEvent
 from src.menu import Menu
 from src.end_menu import EndMenu
 from src.display import Display
 from src.game_logic import GameLogic
+from src.frame_scheduler import FrameScheduler
+from src.sound_bank import configure_mixer
+
+
+def system_shutdown():
+    os.system("sudo shutdown now")
 
 
 class Game:
-    def __init__(self, debug=False):
+    def __init__(self, debug=False, headless=False, pin_source=None, shutdown=None):
         logging.basicConfig(level=logging.DEBUG)
+        if headless:
+            # No window nor sound card needed, e.g. for tests and benchmarks
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
+        if shutdown is None:
+            shutdown = (lambda: None) if headless else system_shutdown
+        self.shutdown = shutdown
+        configure_mixer()
         pygame.init()
         pygame.mixer.init()
         pygame.display.set_caption("Bolirana Game")
+        self.scheduler = FrameScheduler()
         self.display = Display()
-        self.menu = Menu()
-        self.end_menu = EndMenu()
-        self.pin = PIN()
+        self.menu = Menu(self.display.sounds)
+        self.end_menu = EndMenu(self.display.sounds)
+        self.pin = PIN(source=pin_source)
         self.gamelogic = GameLogic()
         self.gamelogic.reset_game()
-        self.last_next_action_time = time.time()
-        self.in_end_menu = False
+        self.last_next_action_time = time.monotonic()
+        self.scene = None
+        self.resume_scene = None
+        self.pending_turns = deque()
+        self.last_input_time = time.monotonic()
+        self.redraw = True
         self.debug = debug
+        if hasattr(signal, "SIGUSR1"):
+            # kill -USR1 <pid> dumps the latency histograms on demand
+            signal.signal(signal.SIGUSR1, lambda *_: self.dump_stats())
 
     def run(self):
-        while self.gamelogic.selecting_mode:
-            self.process_events("menu")
+        """
+        Top-level loop of the scene state machine (menu -> game -> win ->
+        end_menu). Scenes hand over by setting self.scene, never by calling
+        each other, so the stack stays flat whatever the number of games.
+        """
+        self.scene = "menu"
+        scenes = {
+            "menu": self.update_menu,
+            "game": self.update_game,
+            "win": self.update_win,
+            "end_menu": self.update_end_menu,
+        }
+        while self.scene is not None:
+            scene = self.scene
+            self.display.begin_frame()
+            scenes[scene]()
+            self.display.present()
+            if self.scene != scene:
+                self.redraw = True
+            if self.is_idle():
+                self.pin.wait(
+                    IDLE_KEYBOARD_INTERVAL if self.debug else IDLE_WAKE_INTERVAL
+                )
+                self.scheduler.resync()
+            else:
+                # GIFs, roulettes and fireworks own the screen, paced at
+                # the animation rate whatever the scene they play in
+                self.scheduler.tick(
+                    "animation" if self.display.animating() else scene
+                )
+        # "Continuer" after a win leaves the loop without going through cleanup()
+        self.dump_stats()
+
+    def is_idle(self):
+        """
+        True when nothing happened for IDLE_TIMEOUT seconds and nothing is
+        left to draw: the loop then sleeps until the pin sampler signals an
+        event instead of redrawing at full rate.
+        """
+        if time.monotonic() - self.last_input_time < IDLE_TIMEOUT:
+            return False
+        if self.redraw or self.pending_turns or self.display.timeline.active:
+            return False
+        if self.scene == "game":
+            return not self.gamelogic.draw_game
+        return self.scene in ("menu", "end_menu")
+
+    def update_menu(self):
+        self.process_events("menu")
+        if not self.gamelogic.selecting_mode:
+            self.start_game()
+            return
+        if self.redraw:
             self.display.draw_menu(self.menu)
-            pygame.time.Clock().tick(FPS)
+            self.redraw = False
+
+    def start_game(self):
+        logging.debug("Starting game...")
+        self.pending_turns.clear()
+        self.display.timeline.clear()
+        self.display.play_intro()
+        self.scene = "game"
+
+    def update_game(self):
+        self.process_events("game")
+        self.handle_pending_turns()
+        if self.scene != "game":
+            # BENTER opened the end menu, it never leads to a game draw
+            self.display.latency.drop_pending()
+            return
+        if not self.display.animating():
+            if not self.gamelogic.game_ended:
+                self.gamelogic.check_game_end(self.display)
+            if self.gamelogic.draw_game:
+                self.update_game_display()
+                self.gamelogic.draw_game = False
+            self.display.latency.discard_pending()
+        if self.display.update_animations():
+            self.gamelogic.draw_game = True
+        self.redraw = False
+
+        if self.gamelogic.game_ended:
+            self.pending_turns.clear()
+            self.display.draw_win(self.gamelogic.players, self.gamelogic.team_mode)
+            self.scene = "win"
+
+    def update_win(self):
+        self.process_events("win")
+        self.display.update_animations()
+        if not self.display.animating():
+            self.open_end_menu(resume_scene=None)
 
-        self.play()
-        self.display.draw_end_menu(self.end_menu)
+    def open_end_menu(self, resume_scene):
+        """Shows the end menu, "Continuer" goes back to resume_scene."""
+        self.resume_scene = resume_scene
+        self.display.drop_overlays()
+        self.scene = "end_menu"
+
+    def update_end_menu(self):
+        self.process_events("end_menu")
+        if self.scene == "end_menu" and self.redraw:
+            self.display.draw_end_menu(self.end_menu)
+            self.redraw = False
 
     def process_events(self, mode):
         if self.debug:
@@ -61,21 +184,31 @@ class Game:
                 if event.type == pygame.QUIT:
                     self.cleanup()
                 elif event.type == pygame.KEYDOWN:
+                    self.on_input()
                     if mode == "menu":
                         self.handle_key_event(event.key)
                     elif mode == "game":
-                        self.handle_turn(self.keyboard_input(event.key))
+                        pin = self.keyboard_input(event.key)
+                        if pin is not None:
+                            self.pending_turns.append(
+                                PinEvent(pin, "LOW", time.monotonic())
+                            )
                     elif mode == "end_menu":
                         self.handle_end_menu_key_event(event.key)
         else:
-            pin = self.pin.read_pin_states(mode)
-            if pin is not None:
+            pygame.event.clear()  # Input comes from the pins, keep SDL's queue empty
+            for event in self.pin.get_events(mode):
+                self.on_input()
                 if mode == "menu":
-                    self.handle_menu_button(pin)
+                    self.handle_menu_button(event.pin)
                 elif mode == "game":
-                    self.handle_turn(pin)
+                    self.pending_turns.append(event)
                 elif mode == "end_menu":
-                    self.handle_end_menu_key_event(pin)
+                    self.handle_end_menu_button(event.pin)
+
+    def on_input(self):
+        self.last_input_time = time.monotonic()
+        self.redraw = True
 
     def handle_menu_button(self, pin):
         if pin in [PIN_UP, PIN_DOWN, PIN_LEFT, PIN_RIGHT]:
@@ -101,47 +234,39 @@ class Game:
         self.gamelogic.penalty = self.menu.get_penalty()
         self.gamelogic.setup_game(self.display)
 
-    def play(self):
-        logging.debug("Starting game...")
-        self.display.play_intro()
-
-        while not self.gamelogic.game_ended:
-            self.process_events("game")
+    def handle_pending_turns(self):
+        """
+        Handles the queued pin events. While an exclusive animation owns the
+        screen the hits stay queued, in order, instead of being lost. The end
+        of the game is checked before each of them, so a hit never counts
+        before the previous ones decided who won.
+        """
+        while (
+            self.pending_turns and self.scene == "game" and not self.display.animating()
+        ):
             self.gamelogic.check_game_end(self.display)
-            if self.gamelogic.draw_game:
-                self.update_game_display()
-                self.gamelogic.draw_game = False
-
-            pygame.time.Clock().tick(FPS)
-
-        self.display.draw_win(self.gamelogic.players, self.gamelogic.team_mode)
-        time.sleep(5)
-        self.in_end_menu = True
-        while self.in_end_menu:
-            self.process_events("end_menu")
-            self.display.draw_end_menu(self.end_menu)
-            pygame.display.flip()
-            pygame.time.Clock().tick(FPS)
+            if self.gamelogic.game_ended or self.display.animating():
+                break
+            event = self.pending_turns.popleft()
+            self.display.latency.begin(event)
+            self.handle_turn(event)
 
-    def handle_turn(self, pin):
+    def handle_turn(self, event):
+        pin = event.pin
         if pin is not None:
             logging.debug(f"Handling turn for pin: {pin}")
-            current_time = time.time()
+            # Cooldown between the presses themselves, not between the moments
+            # the queue got to them
             if pin == PIN_BNEXT:
-                if current_time - self.last_next_action_time >= ACTION_COOLDOWN:
+                if event.timestamp - self.last_next_action_time >= ACTION_COOLDOWN:
                     self.gamelogic.next_player(self.display)
                     self.gamelogic.draw_game = True
-                    self.last_next_action_time = current_time
+                    self.last_next_action_time = event.timestamp
             elif pin == PIN_BENTER:
-                self.in_end_menu = True
-                while self.in_end_menu:
-                    self.process_events("end_menu")
-                    self.display.draw_end_menu(self.end_menu)
-                    pygame.time.Clock().tick(FPS)
+                self.open_end_menu(resume_scene="game")
                 self.gamelogic.draw_game = True
             elif any(hole.pin == pin for hole in self.gamelogic.holes):
                 self.gamelogic.goal(pin, self.display)
-                
 
     def handle_key_event(self, key):
         key_map = {
@@ -158,6 +283,12 @@ class Game:
             action()
             self.gamelogic.selecting_mode = False
 
+    def handle_end_menu_button(self, pin):
+        if pin in [PIN_UP, PIN_DOWN]:
+            self.end_menu.handle_button_press({PIN_UP: "UP", PIN_DOWN: "DOWN"}[pin])
+        elif pin == PIN_BENTER:
+            self.execute_end_menu_option()
+
     def handle_end_menu_key_event(self, key):
         if key in [pygame.K_UP, pygame.K_DOWN, pygame.K_RETURN]:
             key_map = {
@@ -168,20 +299,19 @@ class Game:
             action = key_map[key]
             if callable(action):
                 action()
-                self.in_end_menu = False
             else:
                 self.end_menu.handle_button_press(action)
 
     def execute_end_menu_option(self):
         option = self.end_menu.options[self.end_menu.selected_option]
         if option == "Continuer":
-            pass
+            self.scene = self.resume_scene
         elif option == "Nouveau":
             self.gamelogic.reset_game()
-            self.run()
+            self.scene = "menu"
         elif option == "Recommencer":
             self.gamelogic.restart_game()
-            self.play()
+            self.start_game()
         elif option == "Quitter":
             self.cleanup()
 
@@ -215,9 +345,17 @@ class Game:
             ),
         )
 
+    def dump_stats(self):
+        self.display.latency.dump()
+        self.scheduler.dump()
+        self.display.text_cache.dump()
+        self.display.asset_manager.dump()
+
     def cleanup(self):
+        self.pin.stop()
+        self.dump_stats()
         pygame.quit()
-        os.system("sudo shutdown now")
+        self.shutdown()
         sys.exit()
 
 
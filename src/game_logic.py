@@ -50,6 +50,7 @@ class GameLogic:
             "Bouteille": self.setup_bouteille_mode,
         }
         setup_methods.get(self.game_mode, lambda _: None)(display)
+        display.build_game_layer(self.holes, self.score, self.game_mode, self.team_mode)
         self.selecting_mode = False
 
     def setup_normal_mode(self, display):
@@ -215,17 +216,35 @@ class GameLogic:
 
     def next_player(self, display):
         if self.current_player.turn_score == 0 and self.penalty:
-            points = display.draw_penalty()
-            display.draw_holes(self.holes)
-            self.current_player.score -= points
+            display.draw_penalty(self.penalty_callback(self.current_player))
 
         self.current_player = Player.activate_next_player(
             self.current_player, self.players
         )
 
+    def penalty_callback(self, player):
+        """Returns the callback removing the penalty roulette result."""
+
+        def apply_penalty(points):
+            player.score -= points
+            self.draw_game = True
+
+        return apply_penalty
+
+    def roulette_callback(self, player):
+        """Returns the callback adding the large frog roulette result."""
+
+        def add_points(points):
+            player.score += points
+            player.turn_score += points
+            self.draw_game = True
+
+        return add_points
+
     def goal(self, pin, display):
         hole = next((hole for hole in self.holes if pin == hole.pin), None)
         if hole is not None:
+            display.latency.tag(hole.type)
             points = hole.value
             display.draw_goal_animation(hole)
             if hole.type == "bottle":
@@ -251,10 +270,9 @@ class GameLogic:
                 self.current_player.score += points
                 self.draw_game = True
             elif hole.type == "large_frog":
-                points = display.animation_large_frog()
-                self.current_player.score += points
-                self.current_player.turn_score += points
-                self.draw_game = True
+                display.animation_large_frog(
+                    self.roulette_callback(self.current_player)
+                )
             else:
                 self.current_player.turn_score += points
                 self.current_player.score += points
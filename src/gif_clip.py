@@ -0,0 +1,53 @@
+import bisect
+
+import pygame
+from PIL import Image
+
+DEFAULT_FRAME_DURATION = 100  # ms, for frames without a duration
+
+
+class GifClip:
+    """
+    GIF decoded once into display-ready surfaces, already resized to fit the
+    area it is played in, with the duration of each frame in seconds.
+    """
+
+    def __init__(self, frames, durations):
+        self.frames = frames
+        self.durations = durations
+        self.end_times = []
+        end_time = 0
+        for frame_duration in durations:
+            end_time += frame_duration
+            self.end_times.append(end_time)
+        self.duration = end_time
+
+    @classmethod
+    def load(cls, path, max_size):
+        """Decodes the GIF at path, shrinking frames larger than max_size."""
+        max_width, max_height = max_size
+        gif = Image.open(path)
+        frames, durations = [], []
+        try:
+            while True:
+                frame = gif.convert("RGBA")
+                width, height = frame.size
+                if width > max_width or height > max_height:
+                    scale = min(max_width / width, max_height / height)
+                    frame = frame.resize(
+                        (int(width * scale), int(height * scale)),
+                        Image.Resampling.LANCZOS,
+                    )
+                surface = pygame.image.frombuffer(frame.tobytes(), frame.size, "RGBA")
+                frames.append(surface.convert_alpha())
+                duration = gif.info.get("duration") or DEFAULT_FRAME_DURATION
+                durations.append(duration / 1000)
+                gif.seek(gif.tell() + 1)
+        except EOFError:
+            pass
+        return cls(frames, durations)
+
+    def frame_at(self, elapsed):
+        """Frame shown elapsed seconds after the start, late frames are skipped."""
+        index = bisect.bisect_right(self.end_times, elapsed)
+        return self.frames[min(index, len(self.frames) - 1)]
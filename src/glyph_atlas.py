@@ -0,0 +1,39 @@
+import pygame
+
+ATLAS_CHARS = "0123456789-+"
+
+
+class GlyphAtlas:
+    """
+    Digits and a few signs of one font and color rendered once side by side
+    on a single surface. Numbers are then drawn glyph by glyph with blits of
+    sub-rects, without going through the font rasterizer.
+    """
+
+    def __init__(self, font, color, chars=ATLAS_CHARS):
+        glyphs = {char: font.render(char, True, color) for char in chars}
+        self.height = max(glyph.get_height() for glyph in glyphs.values())
+        self.surface = pygame.Surface(
+            (sum(glyph.get_width() for glyph in glyphs.values()), self.height),
+            pygame.SRCALPHA,
+        )
+        self.rects = {}
+        self.advances = {}
+        x = 0
+        for char, glyph in glyphs.items():
+            self.surface.blit(glyph, (x, 0))
+            self.rects[char] = pygame.Rect(x, 0, glyph.get_width(), self.height)
+            self.advances[char] = font.metrics(char)[0][4]
+            x += glyph.get_width()
+
+    def size(self, text):
+        return sum(self.advances[char] for char in text), self.height
+
+    def draw(self, surface, text, position):
+        """Draws text with its top left corner at position, returns its area."""
+        x, y = position
+        area = pygame.Rect((x, y), self.size(text))
+        for char in text:
+            surface.blit(self.surface, (x, y), self.rects[char])
+            x += self.advances[char]
+        return area
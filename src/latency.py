@@ -0,0 +1,90 @@
+import logging
+import time
+
+
+class LatencyHistogram:
+    """Fixed 1 ms bucket histogram, the last bucket collects overflows."""
+
+    def __init__(self, max_ms=2000):
+        self.buckets = [0] * (max_ms + 1)
+        self.count = 0
+
+    def record(self, latency_ms):
+        index = min(max(int(latency_ms), 0), len(self.buckets) - 1)
+        self.buckets[index] += 1
+        self.count += 1
+
+    def percentile(self, percent):
+        target = self.count * percent / 100
+        seen = 0
+        for latency_ms, bucket in enumerate(self.buckets):
+            seen += bucket
+            if bucket and seen >= target:
+                return latency_ms + 1
+        return 0
+
+
+class LatencyTracker:
+    """
+    Measures the time from a pin capture to the display update showing its
+    result. Events are tagged with begin() when the game handles them, with
+    tag() once the hole type is known, marked by drawn() once their result is
+    drawn and closed by presented() when the frame reaches the screen.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self.pending = []
+        self.drawn_pending = False
+
+    def begin(self, event):
+        self.pending.append({"event": event, "hole": None})
+
+    def tag(self, hole_type):
+        if self.pending:
+            self.pending[-1]["hole"] = hole_type
+
+    def drawn(self):
+        self.drawn_pending = bool(self.pending)
+
+    def presented(self):
+        if not self.drawn_pending:
+            return
+        self.drawn_pending = False
+        now = time.monotonic()
+        for entry in self.pending:
+            latency_ms = (now - entry["event"].timestamp) * 1000
+            self._record(f"pin {entry['event'].pin}", latency_ms)
+            if entry["hole"] is not None:
+                self._record(f"hole {entry['hole']}", latency_ms)
+        self.pending.clear()
+
+    def discard_pending(self):
+        """Forgets the events whose handling did not update the screen."""
+        if not self.drawn_pending:
+            self.pending.clear()
+
+    def drop_pending(self):
+        """Forgets every pending event, when the scene leaves the game."""
+        self.pending.clear()
+        self.drawn_pending = False
+
+    def _record(self, key, latency_ms):
+        self.histograms.setdefault(key, LatencyHistogram()).record(latency_ms)
+
+    def report(self):
+        lines = []
+        for key in sorted(self.histograms):
+            histogram = self.histograms[key]
+            lines.append(
+                f"{key}: n={histogram.count} "
+                f"p50={histogram.percentile(50)}ms "
+                f"p95={histogram.percentile(95)}ms "
+                f"p99={histogram.percentile(99)}ms"
+            )
+        return lines
+
+    def dump(self):
+        logging.info("Pin to screen latency:")
+        for line in self.report() or ["no sample"]:
+            logging.info(f"  {line}")
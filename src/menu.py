@@ -1,8 +1,7 @@
-import os
 import pygame
 
 class Menu:
-    def __init__(self):
+    def __init__(self, sounds):
 
         self.selected_option = 0
         self.options = [
@@ -27,17 +26,11 @@ class Menu:
             },
         ]
 
-        self.frog_sound = self.load_sound(
-                "sounds", "frog.mp3"
-            )
-        
-    def load_sound(self, folder, filename):
-        path = os.path.join(os.path.dirname(__file__), "..", "assets", folder, filename)
-        return pygame.mixer.Sound(path)
+        self.sounds = sounds
 
     def handle_button_press(self, button):
         option = self.options[self.selected_option]
-        self.frog_sound.play()
+        self.sounds.play("frog")
         if button == "UP":
             self.selected_option = (self.selected_option - 1) % len(self.options)
         elif button == "DOWN":
@@ -1,5 +1,4 @@
 from src.constants import (
-    PIN_STATES_FILE,
     PIN_BENTER,
     PIN_BNEXT,
     PIN_DOWN,
@@ -14,66 +13,80 @@ from src.constants import (
     PIN_HBOTTLE,
     PIN_HSFROG,
     PIN_HLFROG,
+    PIN_BACKEND,
+    INPUT_BUFFER_SIZE,
 )
-import json
-import time
+from src.pin_watcher import JsonPinSource
+from src.shared_pins import SharedPinSource
+from src.ring_buffer import RingBuffer
+from src.sampler import PinSampler
 import logging
+import threading
 
+MODE_PINS = {
+    "menu": {PIN_BENTER, PIN_DOWN, PIN_UP, PIN_LEFT, PIN_RIGHT},
+    "game": {
+        PIN_BNEXT,
+        PIN_BENTER,
+        PIN_H20,
+        PIN_H25,
+        PIN_H40,
+        PIN_H50,
+        PIN_H100,
+        PIN_HBOTTLE,
+        PIN_HSFROG,
+        PIN_HLFROG,
+    },
+    "end_menu": {PIN_BENTER, PIN_DOWN, PIN_UP},
+}
+
+SOURCES = {
+    "json": JsonPinSource,
+    "shm": SharedPinSource,
+}
 
-class PIN:
-    def __init__(self):
-        self.pin_states = {}
-        self.last_read_time = time.time()
 
-    def read_pin_states(self, game_action):
-        try:
-            with open(PIN_STATES_FILE, "r") as file:
-                self.pin_states = json.load(file)
-            logging.debug(f"Pin states read: {self.pin_states}")
-        except (json.JSONDecodeError, FileNotFoundError):
-            self.pin_states = {}
+def default_source(backend):
+    """Source of backend, the JSON file when the shared region is missing."""
+    source = SOURCES[backend]()
+    if isinstance(source, SharedPinSource) and not source.available():
+        logging.warning("Falling back to the JSON pin states file")
+        source = JsonPinSource()
+    return source
 
-        return self._get_next_pin(game_action)
 
-    def _reset_pin_states(self):
-        for pin in self.pin_states:
-            self.pin_states[pin] = "HIGH"
-        with open(PIN_STATES_FILE, "w") as file:
-            json.dump(self.pin_states, file)
-        logging.debug(f"Pin states reset to HIGH: {self.pin_states}")
+class PIN:
+    def __init__(self, backend=PIN_BACKEND, source=None):
+        if source is None:
+            source = default_source(backend)
+        self.events = RingBuffer(INPUT_BUFFER_SIZE)
+        self.wakeup = threading.Event()
+        self.sampler = PinSampler(source, self.events, notify=self.wakeup.set)
+        self.sampler.start()
+        logging.debug(f"Pin source: {type(source).__name__}")
+
+    def get_events(self, game_action):
+        """
+        Drains the edges buffered by the sampler since the last call and
+        returns the presses relevant to game_action, oldest first.
+        """
+        presses = []
+        while (event := self.events.pop()) is not None:
+            if event.state == "LOW" and event.pin in MODE_PINS.get(game_action, ()):
+                logging.debug(f"Pin event: {event}")
+                presses.append(event)
+        return presses
 
-    def _get_next_pin(self, game_action):
-        current_time = time.time()
-        if current_time - self.last_read_time < 0.3:
-            return None  # Ignore if less than 0.3 seconds have passed
+    def wait(self, timeout):
+        """
+        Blocks until the sampler buffers an event, False on timeout. The
+        sampler slows down to its idle rate meanwhile.
+        """
+        self.sampler.idle = True
+        woken = self.wakeup.wait(timeout)
+        self.wakeup.clear()
+        self.sampler.idle = False
+        return woken
 
-        for pin, state in self.pin_states.items():
-            if (
-                game_action == "menu"
-                and int(pin) in {PIN_BENTER, PIN_DOWN, PIN_UP, PIN_LEFT, PIN_RIGHT}
-                and state == "LOW"
-            ):
-                self.last_read_time = current_time  # Update the last read time
-                self._reset_pin_states()  # Reset pin states to LOW
-                return int(pin)
-            elif (
-                game_action == "game"
-                and int(pin)
-                in {
-                    PIN_BNEXT,
-                    PIN_BENTER,
-                    PIN_H20,
-                    PIN_H25,
-                    PIN_H40,
-                    PIN_H50,
-                    PIN_H100,
-                    PIN_HBOTTLE,
-                    PIN_HSFROG,
-                    PIN_HLFROG,
-                }
-                and state == "LOW"
-            ):
-                self.last_read_time = current_time  # Update the last read time
-                self._reset_pin_states()  # Reset pin states to LOW
-                return int(pin)
-        return None
+    def stop(self):
+        self.sampler.stop()
@@ -0,0 +1,134 @@
+import ctypes
+import ctypes.util
+import json
+import logging
+import os
+import select
+import struct
+import time
+
+from src.constants import PIN_STATES_FILE, PIN_POLL_INTERVAL
+
+# inotify event masks (see <sys/inotify.h>)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+
+
+class Inotify:
+    """Minimal ctypes binding to the Linux inotify API."""
+
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, directory, mask):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed on {directory}")
+
+    def wait(self, timeout):
+        """Blocks until events arrive or timeout expires, returns the file names."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 4096)
+        except BlockingIOError:
+            return []
+        names = []
+        offset = 0
+        while offset < len(data):
+            _, _, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            names.append(os.fsdecode(data[offset : offset + length].rstrip(b"\0")))
+            offset += length
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class StatPoller:
+    """Fallback notifier comparing the file mtime when inotify is unavailable."""
+
+    def __init__(self, path, interval):
+        self.path = path
+        self.interval = interval
+        self.signature = self._signature()
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    def wait(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        signature = self._signature()
+        if signature == self.signature:
+            return []
+        self.signature = signature
+        return [os.path.basename(self.path)]
+
+    def close(self):
+        pass
+
+
+class JsonPinSource:
+    """
+    Pin source backed by the pin states file. It is event driven: wait()
+    blocks until the kernel reports the file changed, so the file is only
+    parsed when it was actually rewritten.
+    """
+
+    event_driven = True
+
+    def __init__(self, path=PIN_STATES_FILE):
+        self.path = os.path.abspath(path)
+        self.filename = os.path.basename(self.path)
+        self.notifier = None
+
+    def open(self):
+        try:
+            self.notifier = Inotify(
+                os.path.dirname(self.path), IN_CLOSE_WRITE | IN_MOVED_TO
+            )
+        except (OSError, AttributeError) as e:
+            logging.warning(f"inotify unavailable ({e}), polling {self.path}")
+            self.notifier = StatPoller(self.path, PIN_POLL_INTERVAL)
+
+    def wait(self, timeout):
+        return self.filename in self.notifier.wait(timeout)
+
+    def read(self):
+        """Returns the (pin, state) edges found in the file, in order."""
+        try:
+            with open(self.path, "r") as file:
+                pin_states = json.load(file)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return []
+        logging.debug(f"Pin states read: {pin_states}")
+
+        low_pins = sorted(
+            int(pin) for pin, state in pin_states.items() if state == "LOW"
+        )
+        if not low_pins:
+            return []
+        self._reset_pin_states(pin_states)
+        return [(pin, "LOW") for pin in low_pins] + [(pin, "HIGH") for pin in low_pins]
+
+    def _reset_pin_states(self, pin_states):
+        for pin in pin_states:
+            pin_states[pin] = "HIGH"
+        with open(self.path, "w") as file:
+            json.dump(pin_states, file)
+        logging.debug(f"Pin states reset to HIGH: {pin_states}")
+
+    def close(self):
+        if self.notifier is not None:
+            self.notifier.close()
+            self.notifier = None
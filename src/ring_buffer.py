@@ -0,0 +1,33 @@
+class RingBuffer:
+    """
+    Fixed-size single-producer / single-consumer ring buffer.
+    No lock is needed: only the producer moves tail and only the consumer
+    moves head, and each slot is written before tail publishes it.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.items = [None] * capacity
+        self.head = 0
+        self.tail = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return self.tail - self.head
+
+    def push(self, item):
+        if self.tail - self.head >= self.capacity:
+            self.dropped += 1
+            return False
+        self.items[self.tail % self.capacity] = item
+        self.tail += 1
+        return True
+
+    def pop(self):
+        if self.head == self.tail:
+            return None
+        index = self.head % self.capacity
+        item = self.items[index]
+        self.items[index] = None
+        self.head += 1
+        return item
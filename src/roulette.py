@@ -1,95 +1,105 @@
 import pygame
 import random
-import time
-import os
 import math
 from pygame.locals import *
+from src.animation import Animation
+from src.constants import (
+    ROULETTE_ANGLE_STEP,
+    ROULETTE_SPIN_DURATION,
+    ROULETTE_TURNS,
+)
 
 # Define the solid gold color
 GOLD_COLOR = (255, 215, 0)
 DARK_GOLD_COLOR = (184, 134, 11)
 LIGHT_GOLD_COLOR = (255, 239, 153)
 
+ROULETTE_VALUES = {
+    "frog": [300, 350, 400, 450, 300, 350, 400, 450],
+    "null": [10, 50, 40, 20, 10, 50, 40, 20],
+}
 
-class RouletteAnimation:
-    def __init__(self, screen, type):
-        self.screen = screen
-        self.clock = pygame.time.Clock()
 
-        screen_width, screen_height = self.screen.get_size()
-        self.center_x, self.center_y = screen_width // 2, screen_height // 2
+def ease_out_cubic(progress):
+    """Fast start, slows down to a stop at progress 1."""
+    return 1 - (1 - progress) ** 3
 
-        self.sections = 8
-        self.radius = 250
-        self.inner_radius = 50
-        self.section_colors = [
-            pygame.Color("red"),
-            pygame.Color("blue"),
-            pygame.Color("green"),
-            pygame.Color("yellow"),
-            pygame.Color("orange"),
-            pygame.Color("purple"),
-            pygame.Color("pink"),
-            pygame.Color("cyan"),
-        ]
 
-        if type == "frog":
-            self.values = [300, 350, 400, 450, 300, 350, 400, 450]
-        else:
-            self.values = [10, 50, 40, 20, 10, 50, 40, 20]
-
-        self.font = pygame.font.Font(None, 80)
-        self.roulette_sound = pygame.mixer.Sound(
-            os.path.join(
-                os.path.dirname(__file__),
-                "..",
-                "assets",
-                "sounds",
-                "roulette.mp3",
-            )
-        )
-        self.roulette_end_sound = pygame.mixer.Sound(
-            os.path.join(
-                os.path.dirname(__file__),
-                "..",
-                "assets",
-                "sounds",
-                "roulette_end.mp3",
-            )
-        )
+class RouletteWheel:
+    """
+    Wheel of one roulette type pre-rendered at every angle it can show, each
+    spin frame is then a single blit. When the values repeat every half turn
+    the wheel looks the same half a turn later, half a turn of frames is then
+    enough.
+    """
+
+    sections = 8
+    radius = 250
+    inner_radius = 50
 
-    def draw_circle_with_border(self, center, radius, border_color, border_width):
+    def __init__(self, screen, values, font, angle_step=ROULETTE_ANGLE_STEP):
+        self.screen = screen
+        self.values = values
+        self.font = font
+        self.angle_step = angle_step
+        half = self.sections // 2
+        self.period = 180 if values[:half] == values[half:] else 360
+        # Rendered here, fonts are not used from the asset workers
+        self.labels = [
+            font.render(str(value), True, pygame.Color("black")) for value in values
+        ]
+        self.frames = []
+
+    def prerender(self):
+        """Renders every frame, returns the wheel."""
+        size = (self.radius + 20) * 2
+        frames = []
+        for angle in range(0, self.period, self.angle_step):
+            frame = pygame.Surface((size, size)).convert(self.screen)
+            self.draw_roulette(frame, angle)
+            frames.append(frame)
+        self.frames = frames
+        return self
+
+    def frame(self, angle):
+        """Frame closest to angle, black around the wheel."""
+        return self.frames[round(angle / self.angle_step) % len(self.frames)]
+
+    def draw_circle_with_border(
+        self, surface, center, radius, border_color, border_width
+    ):
         """Draws a circle with a border effect."""
         for i in range(border_width):
             pygame.draw.circle(
-                self.screen,
+                surface,
                 border_color,
                 center,
                 radius + i,
                 width=1,
             )
 
-    def draw_gradient_section(self, start_angle, end_angle, color1, color2):
+    def draw_gradient_section(self, surface, start_angle, end_angle, color1, color2):
+        center_x, center_y = surface.get_rect().center
         steps = 100
         for i in range(steps):
             angle = start_angle + (end_angle - start_angle) * (i / steps)
 
             pygame.draw.polygon(
-                self.screen,
+                surface,
                 color1,
                 [
-                    (self.center_x, self.center_y),
+                    (center_x, center_y),
                     (
-                        self.center_x + self.radius * math.cos(math.radians(angle)),
-                        self.center_y + self.radius * math.sin(math.radians(angle)),
+                        center_x + self.radius * math.cos(math.radians(angle)),
+                        center_y + self.radius * math.sin(math.radians(angle)),
                     ),
                     (
-                        self.center_x
+                        center_x
                         + self.radius
                         * math.cos(
                             math.radians(angle + (end_angle - start_angle) / steps)
                         ),
-                        self.center_y
+                        center_y
                         + self.radius
                         * math.sin(
                             math.radians(angle + (end_angle - start_angle) / steps)
@@ -98,12 +108,14 @@ class RouletteAnimation:
                 ],
             )
 
-    def draw_roulette(self, angle):
+    def draw_roulette(self, surface, angle):
+        center_x, center_y = surface.get_rect().center
+
         # Draw the dark grey background circle to make it visible against black
         pygame.draw.circle(
-            self.screen,
+            surface,
             pygame.Color("darkgrey"),
-            (self.center_x, self.center_y),
+            (center_x, center_y),
             self.radius + 10,
         )
 
@@ -116,66 +128,101 @@ class RouletteAnimation:
             start_angle = (360 / self.sections) * i + angle - (360 / self.sections / 2)
             end_angle = start_angle + (360 / self.sections)
             self.draw_gradient_section(
+                surface,
                 start_angle,
                 end_angle,
                 pygame.Color("gold"),
                 pygame.Color("darkgoldenrod"),
             )
             pygame.draw.line(
-                self.screen,
+                surface,
                 GOLD_COLOR,
-                (self.center_x, self.center_y),
+                (center_x, center_y),
                 (
-                    self.center_x + self.radius * math.cos(math.radians(start_angle)),
-                    self.center_y + self.radius * math.sin(math.radians(start_angle)),
+                    center_x + self.radius * math.cos(math.radians(start_angle)),
+                    center_y + self.radius * math.sin(math.radians(start_angle)),
                 ),
                 5,
             )
             pygame.draw.line(
-                self.screen,
+                surface,
                 GOLD_COLOR,
-                (self.center_x, self.center_y),
+                (center_x, center_y),
                 (
-                    self.center_x + self.radius * math.cos(math.radians(end_angle)),
-                    self.center_y + self.radius * math.sin(math.radians(end_angle)),
+                    center_x + self.radius * math.cos(math.radians(end_angle)),
+                    center_y + self.radius * math.sin(math.radians(end_angle)),
                 ),
                 5,
             )
 
             angle_offset = angle + (360 / self.sections) * i
-            x = self.center_x + (self.radius * 0.7) * math.cos(
-                math.radians(angle_offset)
-            )
-            y = self.center_y + (self.radius * 0.7) * math.sin(
-                math.radians(angle_offset)
-            )
+            x = center_x + (self.radius * 0.7) * math.cos(math.radians(angle_offset))
+            y = center_y + (self.radius * 0.7) * math.sin(math.radians(angle_offset))
 
-            # Render the text
-            text_surface = self.font.render(
-                str(self.values[i]), True, pygame.Color("black")
+            # Rotate the label
+            text_surface_rotated = pygame.transform.rotate(
+                self.labels[i], -angle_offset
             )
-            text_surface_rotated = pygame.transform.rotate(text_surface, -angle_offset)
             text_rect = text_surface_rotated.get_rect(center=(x, y))
-            self.screen.blit(text_surface_rotated, text_rect)
+            surface.blit(text_surface_rotated, text_rect)
 
         # Draw the gold border around the main circle
         self.draw_circle_with_border(
-            (self.center_x, self.center_y), self.radius, GOLD_COLOR, 10
+            surface, (center_x, center_y), self.radius, GOLD_COLOR, 10
         )
 
         # Draw the gold border around the inner circle
         self.draw_circle_with_border(
-            (self.center_x, self.center_y), self.inner_radius, GOLD_COLOR, 5
+            surface, (center_x, center_y), self.inner_radius, GOLD_COLOR, 5
         )
 
         # Draw the inner circle
         pygame.draw.circle(
-            self.screen,
+            surface,
             pygame.Color("white"),
-            (self.center_x, self.center_y),
+            (center_x, center_y),
             self.inner_radius - 1,
         )
 
+
+class RouletteAnimation(Animation):
+    """
+    Spins the wheel and reports the value it stops on, with the "roulette"
+    and "roulette_end" sounds of the sounds bank. The result is drawn from
+    rng when the spin starts, the wheel angle is then a function of the time
+    elapsed: slow frames are skipped, the spin keeps its duration and always
+    stops on the drawn section.
+    """
+
+    def __init__(
+        self,
+        screen,
+        wheel,
+        sounds,
+        on_result=None,
+        rng=None,
+        turns=ROULETTE_TURNS,
+        spin_duration=ROULETTE_SPIN_DURATION,
+    ):
+        super().__init__()
+        self.screen = screen
+        self.wheel = wheel
+        self.sounds = sounds
+        self.on_result = on_result
+        self.rng = rng if rng is not None else random.Random()
+        self.turns = turns
+        self.spin_duration = spin_duration
+
+        screen_width, screen_height = self.screen.get_size()
+        self.center_x, self.center_y = screen_width // 2, screen_height // 2
+
+        self.sections = wheel.sections
+        self.radius = wheel.radius
+        self.values = wheel.values
+        self.font = wheel.font
+        self.value_text = None
+        self.phase = "ready"
+
     def draw_pointer(self):
         pointer = [
             (self.center_x, self.center_y - self.radius - 20),
@@ -185,146 +232,88 @@ class RouletteAnimation:
         pygame.draw.polygon(self.screen, pygame.Color("black"), pointer)
         pygame.draw.polygon(self.screen, pygame.Color("grey"), pointer, 1)
 
-    def run(self):
-        running = True
-        while running:
-            for event in pygame.event.get():
-                if event.type == QUIT:
-                    running = False
-
-            self.screen.fill(
-                pygame.Color("black")
-            )  # Clear the screen with black before
-            current_angle = 0
-            self.draw_roulette(current_angle)
-            self.draw_pointer()
-
-            pygame.display.update()
-            time.sleep(1)
-            self.roulette_sound.play()
-            turns = 2
-            actual_turns = 0
-            angle_in_turn = current_angle
-            self.roulette_sound.play(loops=-1)
-            angular_speed = 15
-
-            while actual_turns < turns:
-                current_angle += angular_speed
-                angle_in_turn += angular_speed
-                current_angle %= 360
-                angle_in_turn %= 360
-
-                for event in pygame.event.get():
-                    if event.type == QUIT:
-                        running = False
-
-                clear_rect = pygame.Rect(
-                    self.center_x - self.radius - 20,
-                    self.center_y - self.radius - 20,
-                    (self.radius + 20) * 2,
-                    (self.radius + 20) * 2,
-                )
-                pygame.draw.rect(self.screen, pygame.Color("black"), clear_rect)
-
-                self.draw_roulette(current_angle)
-                self.draw_pointer()
-
-                if angle_in_turn == 0:
-                    actual_turns += 1
-
-                pygame.display.update()
-                self.clock.tick(30)  # Control frame rate consistently
-
-            additional_section = random.randint(0, self.sections - 1)
-            current_section = 0
-            i = 0
-
-            while current_section < additional_section:
-                for event in pygame.event.get():
-                    if event.type == QUIT:
-                        running = False
-                i += 1
-                current_angle += angular_speed
-                current_angle %= 360
-                if i == 3:
-                    current_section += 1
-                    i = 0
-
-                clear_rect = pygame.Rect(
-                    self.center_x - self.radius - 20,
-                    self.center_y - self.radius - 20,
-                    (self.radius + 20) * 2,
-                    (self.radius + 20) * 2,
-                )
-                pygame.draw.rect(self.screen, pygame.Color("black"), clear_rect)
-
-                self.draw_roulette(current_angle)
-                self.draw_pointer()
-
-                pygame.display.update()
-                self.clock.tick(30)  # Control frame rate consistently
-
+    def spin(self, on_result=None):
+        """
+        Prepares a new spin reporting its value to on_result, returns the
+        animation to play. The same roulette runs one spin at a time, a spin
+        cut short (e.g. by Timeline.clear) is simply dropped.
+        """
+        if self.phase not in ("ready", "done"):
+            self.sounds.stop("roulette")
+        self.start_time = None
+        self.phase = "ready"
+        self.on_result = on_result
+        self.value_text = None
+        return self
+
+    def start(self, now):
+        super().start(now)
+        self.phase = "intro"
+        self.phase_start = now
+        self.current_angle = 0
+        self.current_section = self.rng.randrange(self.sections)
+        # Section i is under the pointer once the wheel turned by -i sections
+        section_angle = 360 // self.sections
+        self.final_angle = (
+            self.turns * 360 + (-self.current_section % self.sections) * section_angle
+        )
+        self.show_value = False
+        self.screen.fill(pygame.Color("black"))  # Clear the screen with black before
+        self.screen_cleared = True
+
+    def update(self, now):
+        if self.phase == "intro":
+            if now - self.phase_start >= 1:
+                self.sounds.play("roulette", loops=-1)
+                self.phase = "spin"
+                self.phase_start = now
+        elif self.phase == "spin":
+            progress = min((now - self.phase_start) / self.spin_duration, 1)
+            self.current_angle = self.final_angle * ease_out_cubic(progress)
+            if progress == 1:
+                self.current_angle = self.final_angle
+                self.sounds.stop("roulette")
+                self.sounds.play("roulette_end")
+                self.phase = "blink"
+                self.phase_start = now
+        elif self.phase == "blink":
             # Blink the final value for 1.5 seconds
-            blink_duration = 1.5
-            blink_interval = 0.25  # Blinking interval
-            end_blink_time = time.time() + blink_duration
-
-            self.roulette_sound.stop()
-            self.roulette_end_sound.play()
-
-            # Translate current section as per positive rotation
-            current_section = 0 - current_section
-            current_section %= 8
-
-            while time.time() < end_blink_time:
-                for event in pygame.event.get():
-                    if event.type == QUIT:
-                        running = False
-
-                clear_rect = pygame.Rect(
-                    self.center_x - self.radius - 20,
-                    self.center_y - self.radius - 20,
-                    (self.radius + 20) * 2,
-                    (self.radius + 20) * 2,
+            self.show_value = int(now * 2) % 2 == 0
+            if now - self.phase_start >= 1.5:
+                self.show_value = True
+                self.phase = "done"
+        return self.phase != "done"
+
+    def draw(self, screen):
+        clear_rect = pygame.Rect(
+            self.center_x - self.radius - 20,
+            self.center_y - self.radius - 20,
+            (self.radius + 20) * 2,
+            (self.radius + 20) * 2,
+        )
+        self.screen.blit(self.wheel.frame(self.current_angle), clear_rect)
+        self.draw_pointer()
+
+        if self.phase in ("blink", "done") and self.show_value:
+            if self.value_text is None:
+                self.value_text = self.font.render(
+                    str(self.result()), True, pygame.Color("black")
                 )
-                pygame.draw.rect(self.screen, pygame.Color("black"), clear_rect)
-
-                self.draw_roulette(current_angle)
-                self.draw_pointer()
-
-                if int(time.time() * 2) % 2 == 0:
-                    final_value_text = self.font.render(
-                        str(self.values[current_section]),
-                        True,
-                        pygame.Color("black"),
-                    )
-                    final_value_rect = final_value_text.get_rect(
-                        center=(self.center_x, self.center_y)
-                    )
-                    self.screen.blit(final_value_text, final_value_rect)
-
-                pygame.display.update()
-                self.clock.tick(30)  # Control frame rate consistently
-
-            # Display the final value in the center
-            clear_rect = pygame.Rect(
-                self.center_x - self.radius - 20,
-                self.center_y - self.radius - 20,
-                (self.radius + 20) * 2,
-                (self.radius + 20) * 2,
+            final_value_rect = self.value_text.get_rect(
+                center=(self.center_x, self.center_y)
             )
-            pygame.draw.rect(self.screen, pygame.Color("black"), clear_rect)
+            self.screen.blit(self.value_text, final_value_rect)
 
-            self.draw_roulette(current_angle)
-            self.draw_pointer()
+        if self.screen_cleared:
+            # The whole screen went black when the roulette started
+            self.screen_cleared = False
+            return self.screen.get_rect()
+        return clear_rect
 
-            final_value_text = self.font.render(
-                str(self.values[current_section]), True, pygame.Color("black")
-            )
-            final_value_rect = final_value_text.get_rect(
-                center=(self.center_x, self.center_y)
-            )
-            self.screen.blit(final_value_text, final_value_rect)
-            pygame.display.update()
+    def result(self):
+        return self.values[self.current_section]
 
-            return self.values[current_section]
+    def finish(self):
+        super().finish()
+        if self.on_result:
+            self.on_result(self.result())
@@ -0,0 +1,86 @@
+import logging
+import threading
+import time
+
+from src.constants import (
+    INPUT_IDLE_SAMPLE_RATE,
+    INPUT_SAMPLE_RATE,
+    PIN_SOURCE_RETRY_DELAY,
+)
+from src.debounce import Debouncer, PinEvent
+
+
+class PinSampler(threading.Thread):
+    """
+    Samples a pin source in the background, independently of the render loop
+    and of blocking animations. Every debounced edge is stamped with its
+    capture time and pushed into a RingBuffer for the game loop to consume.
+    A failing source is logged, closed and reopened after a delay, so input
+    comes back once e.g. the GPIO daemon is up again. While the game is
+    idle polled sources are sampled at idle_rate, the first edge brings
+    the full rate back.
+    """
+
+    def __init__(
+        self,
+        source,
+        buffer,
+        rate=INPUT_SAMPLE_RATE,
+        idle_rate=INPUT_IDLE_SAMPLE_RATE,
+        notify=None,
+    ):
+        super().__init__(name="PinSampler", daemon=True)
+        self.source = source
+        self.buffer = buffer
+        self.notify = notify
+        self.period = 1.0 / rate
+        self.idle_period = 1.0 / idle_rate
+        self.idle = False
+        self.debouncer = Debouncer()
+        self._stopped = threading.Event()
+        self.failures = 0
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                self._run_source()
+            except Exception:
+                logging.exception(
+                    f"Pin source {type(self.source).__name__} failed, "
+                    f"reopening it in {PIN_SOURCE_RETRY_DELAY}s"
+                )
+                self.failures += 1
+                self._stopped.wait(PIN_SOURCE_RETRY_DELAY)
+
+    def _run_source(self):
+        try:
+            self.source.open()
+            self._sample(self.source.read(), time.monotonic())
+            while not self._stopped.is_set():
+                # Event driven sources block until a change, polled ones wake
+                # at rate, or at idle_rate while the game is idle
+                if self.source.event_driven:
+                    timeout = 0.5
+                else:
+                    timeout = self.idle_period if self.idle else self.period
+                if self.source.wait(timeout):
+                    self._sample(self.source.read(), time.monotonic())
+        finally:
+            self.source.close()
+
+    def _sample(self, edges, timestamp):
+        pushed = False
+        for pin, state in edges:
+            event = self.debouncer.update(PinEvent(pin, state, timestamp))
+            if event is None:
+                continue
+            if self.buffer.push(event):
+                pushed = True
+                self.idle = False
+            else:
+                logging.warning(f"Input buffer full, dropped {event}")
+        if pushed and self.notify:
+            self.notify()
@@ -0,0 +1,51 @@
+import time
+
+
+class ScriptedPinSource:
+    """
+    Pin source replaying a script, for headless runs and benchmarks. Each
+    step is (when, pin): when is either a delay in seconds after the previous
+    step or a callable that returns True once the pin may be pressed. Every
+    step is a full press, a LOW edge followed by a HIGH edge.
+    """
+
+    event_driven = False
+
+    def __init__(self, steps, min_interval=0.35):
+        self.steps = list(steps)
+        self.min_interval = min_interval
+        self.index = 0
+        self.last_press_time = 0
+
+    def open(self):
+        self.last_press_time = time.monotonic()
+
+    @property
+    def finished(self):
+        return self.index >= len(self.steps)
+
+    def _ready(self):
+        if self.finished:
+            return False
+        now = time.monotonic()
+        if now - self.last_press_time < self.min_interval:
+            return False
+        when, _ = self.steps[self.index]
+        if callable(when):
+            return when()
+        return now - self.last_press_time >= when
+
+    def wait(self, timeout):
+        time.sleep(timeout)
+        return self._ready()
+
+    def read(self):
+        if not self._ready():
+            return []
+        _, pin = self.steps[self.index]
+        self.index += 1
+        self.last_press_time = time.monotonic()
+        return [(pin, "LOW"), (pin, "HIGH")]
+
+    def close(self):
+        pass
@@ -0,0 +1,173 @@
+"""
+Shared-memory channel between the GPIO daemon and the game.
+
+The region lives on tmpfs and has a fixed layout:
+
+    magic   4 bytes  b"BPIN"
+    seq     uint32   sequence counter, odd while the producer is writing
+    pins    1 byte per pin of PINS, bit 0 is the level (1 = HIGH, 0 = LOW)
+            and bits 1-7 count the HIGH -> LOW transitions (mod 128)
+
+The fall counter lets the reader catch a pulse that was released before it
+looked at the region. Usage from the GPIO daemon:
+
+    writer = SharedPinWriter()
+    writer.set_pin(PIN_H20, "LOW")
+    writer.set_pin(PIN_H20, "HIGH")
+"""
+
+import logging
+import mmap
+import os
+import struct
+import time
+
+from src.constants import PINS, PIN_SHM_FILE
+
+MAGIC = b"BPIN"
+HEADER = struct.Struct("<4sI")
+SEQ_OFFSET = 4
+HIGH = 1
+FALL_STEP = 2
+REGION_MODE = 0o666  # The daemon may run as root, the game must read it
+SNAPSHOT_TIMEOUT = 0.1  # Seconds a write may last before the producer is dead
+
+
+def pin_edges(before, after):
+    """Replays the edges between two pin bytes, including missed pulses."""
+    falls = ((after >> 1) - (before >> 1)) % 128
+    edges = ["HIGH"] if falls and not before & HIGH else []
+    for i in range(falls):
+        edges.append("LOW")
+        if i < falls - 1 or after & HIGH:
+            edges.append("HIGH")
+    if not falls and (after ^ before) & HIGH:
+        edges.append("HIGH" if after & HIGH else "LOW")
+    return edges
+
+
+class SharedPinState:
+    """
+    Maps the shared region. The writable side creates and initialises it
+    when needed, the read-only side raises OSError or ValueError when it is
+    missing or was never initialised.
+    """
+
+    def __init__(self, path=PIN_SHM_FILE, pins=PINS, writable=True):
+        self.pins = tuple(pins)
+        self.offsets = {pin: HEADER.size + i for i, pin in enumerate(self.pins)}
+        self.size = HEADER.size + len(self.pins)
+
+        if writable:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, REGION_MODE)
+        else:
+            fd = os.open(path, os.O_RDONLY)
+        try:
+            if writable:
+                # The umask would otherwise leave the region unreadable to a
+                # game running as another user than the daemon
+                os.fchmod(fd, REGION_MODE)
+                if os.fstat(fd).st_size < self.size:
+                    os.ftruncate(fd, self.size)
+                self.map = mmap.mmap(fd, self.size)
+            else:
+                if os.fstat(fd).st_size < self.size:
+                    raise ValueError(f"{path} is smaller than the pin region")
+                self.map = mmap.mmap(fd, self.size, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+
+        if self.map[: len(MAGIC)] != MAGIC:
+            if not writable:
+                self.map.close()
+                raise ValueError(f"{path} was not initialised by the GPIO daemon")
+            self.map[HEADER.size : self.size] = bytes([HIGH]) * len(self.pins)
+            HEADER.pack_into(self.map, 0, MAGIC, 0)
+
+    def sequence(self):
+        return struct.unpack_from("<I", self.map, SEQ_OFFSET)[0]
+
+    def snapshot(self, timeout=SNAPSHOT_TIMEOUT):
+        """
+        Returns a consistent (sequence, pin bytes) pair. Raises TimeoutError
+        when the region stays mid-write, e.g. the producer died while writing.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            start = self.sequence()
+            if start % 2 == 0:
+                data = self.map[HEADER.size : self.size]
+                if self.sequence() == start:
+                    return start, data
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Shared pin region stuck at sequence {start}")
+            time.sleep(0)
+
+    def close(self):
+        self.map.close()
+
+
+class SharedPinWriter(SharedPinState):
+    """Producer side used by the GPIO daemon."""
+
+    def set_pin(self, pin, state):
+        offset = self.offsets[pin]
+        value = self.map[offset]
+        level = HIGH if state == "HIGH" else 0
+        if level == value & HIGH:
+            return
+        if level == 0:
+            value = (value + FALL_STEP) & 0xFE
+        seq = self.sequence()
+        struct.pack_into("<I", self.map, SEQ_OFFSET, seq + 1)
+        self.map[offset] = value | level
+        struct.pack_into("<I", self.map, SEQ_OFFSET, (seq + 2) & 0xFFFFFFFF)
+
+
+class SharedPinSource:
+    """
+    Consumer side: wait() only compares the sequence counter and read()
+    replays the edges since the previous read. Sampling only reads memory,
+    no syscall nor parsing. The region is mapped read-only, it is created
+    by the GPIO daemon.
+    """
+
+    event_driven = False
+
+    def __init__(self, path=PIN_SHM_FILE):
+        self.path = path
+        self.state = None
+
+    def open(self):
+        self.state = SharedPinState(self.path, writable=False)
+        self.last_seq, self.last_data = self.state.snapshot()
+
+    def available(self):
+        """True when the GPIO daemon set up a region that can be read."""
+        try:
+            SharedPinState(self.path, writable=False).close()
+        except (OSError, ValueError) as e:
+            logging.warning(f"Shared pin region {self.path} unavailable: {e}")
+            return False
+        return True
+
+    def wait(self, timeout):
+        time.sleep(timeout)
+        return self.state.sequence() != self.last_seq
+
+    def read(self):
+        """Returns the (pin, state) edges since the previous read, in order."""
+        self.last_seq, data = self.state.snapshot()
+        edges = [
+            (pin, state)
+            for pin, before, after in zip(self.state.pins, self.last_data, data)
+            for state in pin_edges(before, after)
+        ]
+        self.last_data = data
+        logging.debug(f"Shared pin states changed, sequence {self.last_seq}")
+        return edges
+
+    def close(self):
+        if self.state is not None:
+            self.state.close()
+            self.state = None
@@ -0,0 +1,56 @@
+import pygame
+
+from src.constants import (
+    MIXER_BUFFER,
+    MIXER_CHANNELS,
+    MIXER_FREQUENCY,
+    SOUND_CATEGORIES,
+)
+
+
+def configure_mixer():
+    """Mixer settings, to call before pygame.init() / pygame.mixer.init()."""
+    pygame.mixer.pre_init(MIXER_FREQUENCY, -16, MIXER_CHANNELS, MIXER_BUFFER)
+
+
+class SoundBank:
+    """
+    Every sound of the game, decoded once and shared. Each sound belongs to a
+    category that owns reserved mixer channels, so e.g. a looping roulette
+    never takes the channel a hole hit or a menu click needs.
+    """
+
+    def __init__(self, categories=SOUND_CATEGORIES):
+        channel_count = sum(categories.values())
+        pygame.mixer.set_num_channels(channel_count)
+        pygame.mixer.set_reserved(channel_count)
+        self.channels = {}
+        first_channel = 0
+        for category, count in categories.items():
+            self.channels[category] = [
+                pygame.mixer.Channel(index)
+                for index in range(first_channel, first_channel + count)
+            ]
+            first_channel += count
+        self.sounds = {}
+
+    def add(self, name, category, get_sound):
+        """Registers name, get_sound() returns the decoded sound when needed."""
+        self.sounds[name] = (category, get_sound)
+
+    def get(self, name):
+        return self.sounds[name][1]()
+
+    def play(self, name, loops=0):
+        category, get_sound = self.sounds[name]
+        channels = self.channels[category]
+        # Channels are kept oldest first, when all of them are busy the
+        # oldest sound of the category is cut
+        channel = next((c for c in channels if not c.get_busy()), channels[0])
+        channels.remove(channel)
+        channels.append(channel)
+        channel.play(get_sound(), loops=loops)
+        return channel
+
+    def stop(self, name):
+        self.get(name).stop()
@@ -0,0 +1,109 @@
+import logging
+from collections import OrderedDict
+
+import pygame
+
+from src.constants import TEXT_CACHE_SIZE
+
+
+class TextCache:
+    """
+    Bounded LRU cache of rendered text surfaces, keyed by font, text,
+    antialias and color. The returned surfaces are shared and must not be
+    drawn on.
+
+    Decorated text (shadow, outline) is cached as one composite per-pixel
+    alpha surface, drawn with a single blit instead of one per layer.
+    """
+
+    def __init__(self, capacity=TEXT_CACHE_SIZE):
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, antialias, color):
+        return self._get(
+            (font, text, antialias, tuple(color)),
+            lambda: font.render(text, antialias, color),
+        )
+
+    def render_shadowed(self, font, text, color, shadow_color, shadow_offset):
+        """
+        Returns (surface, origin): the text with its shadow, and where the
+        text itself starts within that surface.
+        """
+
+        def build():
+            return self._composite(
+                [
+                    (self.render(font, text, True, shadow_color), shadow_offset),
+                    (self.render(font, text, True, color), (0, 0)),
+                ]
+            )
+
+        key = ("shadow", font, text, tuple(color), tuple(shadow_color))
+        return self._get(key + tuple(shadow_offset), build)
+
+    def render_outlined(self, font, outline_font, text, color, outline_color):
+        """
+        Returns (surface, origin): the text drawn in font centered over the
+        same text drawn in the larger outline_font, origin being where the
+        outline starts within that surface.
+        """
+
+        def build():
+            outline = self.render(outline_font, text, True, outline_color)
+            actual = self.render(font, text, True, color)
+            return self._composite(
+                [
+                    (outline, (0, 0)),
+                    (
+                        actual,
+                        (
+                            outline.get_width() // 2 - actual.get_width() // 2,
+                            outline.get_height() // 2 - actual.get_height() // 2,
+                        ),
+                    ),
+                ]
+            )
+
+        key = ("outline", font, outline_font, text, tuple(color))
+        return self._get(key + tuple(outline_color), build)
+
+    def _composite(self, layers):
+        """Merges (surface, position) layers, returns (surface, origin)."""
+        area = pygame.Rect(layers[0][1], layers[0][0].get_size()).unionall(
+            [pygame.Rect(position, surface.get_size()) for surface, position in layers]
+        )
+        composite = pygame.Surface(area.size, pygame.SRCALPHA)
+        for surface, (x, y) in layers:
+            composite.blit(surface, (x - area.x, y - area.y))
+        return composite, (-area.x, -area.y)
+
+    def _get(self, key, build):
+        value = self.surfaces.get(key)
+        if value is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = build()
+        self.surfaces[key] = value
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return value
+
+    def clear(self):
+        self.surfaces.clear()
+
+    def report(self):
+        lookups = self.hits + self.misses
+        hit_rate = self.hits / lookups * 100 if lookups else 0
+        return (
+            f"{len(self.surfaces)}/{self.capacity} surfaces, "
+            f"hits={self.hits} misses={self.misses} ({hit_rate:.0f}% hits)"
+        )
+
+    def dump(self):
+        logging.info(f"Text cache: {self.report()}")